@@ -1,37 +1,7 @@
 import streamlit as st
 from utils.model_trainer import get_trained_model
-from utils.model_saver import auto_save_best_model, load_best_model
 import re
 
-def model_loader(best_model, best_metrics, model, metrics, label: str):
-    """
-    Načíta model zo súboru, ak je lepší ako aktuálne natrenovany model.
-
-    Parameters
-    ----------
-    - best_model: natrénovaný model
-    - best_metrics: slovník metrík modelu
-    - model: natrénovaný model
-    - metrics: slovník metrík modelu
-    - label: názov stĺpca, ktorý obsahuje labely
-
-    Returns
-    -------
-    - model: natrénovaný model
-    - metrics: slovník metrík model
-    """
-    if best_model is not None:
-        if metrics["F1 Score"] > best_metrics["F1 Score"]:
-            st.sidebar.info(f"Trained and saved better model than before for {label}.")
-            auto_save_best_model(model, metrics, f"models/best_model_{label}.pkl")
-        else:
-            model, metrics = best_model, best_metrics
-            #metrics.update({"Accuracy": 0.0, "Precision": 0.0, "Recall": 0.0, "F1 Score": 0.0})
-    else: 
-        st.sidebar.info(f"No best model found for {label}. Training new model.")
-        auto_save_best_model(model, metrics, f"models/best_model_{label}.pkl")
-    return model, metrics
-
 def metrics(metrics, label: str):
     """
     Vypíše metriky modelu.
@@ -174,18 +144,10 @@ def main():
     This application is using manual implementation of Bagging Algorithm with Naive Bayes Classifier for toxicity, abusing and provocation detection.
     """)
 
-    best_model_Toxic, best_metrics_Toxic = load_best_model("models/best_model_IsToxic.pkl")
+    # modely aj ich metriky sa načítajú raz na proces a znova iba po zmene súboru modelu
     modelToxic, metricsToxic = get_trained_model("IsToxic")
-
-    best_model_Provocative, best_metrics_Provocative = load_best_model("models/best_model_IsProvocative.pkl")
     modelProvocative, metricsProvocative = get_trained_model("IsProvocative")
-
-    best_model_Abusive, best_metrics_Abusive = load_best_model("models/best_model_IsAbusive.pkl")
     modelAbusive, metricsAbusive = get_trained_model("IsAbusive")
-    
-    modelToxic, metricsToxic = model_loader(best_model_Toxic, best_metrics_Toxic, modelToxic, metricsToxic, "IsToxic")
-    modelProvocative, metricsProvocative = model_loader(best_model_Provocative, best_metrics_Provocative, modelProvocative, metricsProvocative, "IsProvocative")
-    modelAbusive, metricsAbusive = model_loader(best_model_Abusive, best_metrics_Abusive, modelAbusive, metricsAbusive, "IsAbusive")
 
     #st.sidebar.header("Model Metrics")
     metrics(metricsToxic, "IsToxic")
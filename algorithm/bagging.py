@@ -1,4 +1,77 @@
-import random
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from algorithm.tokenizer import default_tokenizer
+from algorithm.naive_bayes import SimpleNaiveBayesClassifier, log_posteriors
+from algorithm.sparse import (FeatureHasher, csr_from_dense, csr_to_dense, encode, make_vocab, prune_vocab,
+                              take_rows, term_counts, segment_sum)
+from utils.instrumentation import instrumentation
+
+# počet dokumentov skórovaných naraz, aby tenzor skóre ostal malý
+PREDICT_BATCH_SIZE = 2048
+
+def majority_vote(predictions, n_classes):
+    """
+    Pre každý dokument vráti triedu s najväčším počtom hlasov.
+    V prípade remízy vráti triedu, za ktorú hlasoval skôr uvedený model.
+
+    Parameters
+    ----------
+    - predictions: pole indexov tried tvaru (počet modelov, počet dokumentov)
+    - n_classes: počet tried
+
+    Returns
+    -------
+    - pred: pole indexov víťazných tried (dĺžka počet dokumentov)
+    """
+    n_estimators = predictions.shape[0]
+    one_hot = predictions[:, :, None] == np.arange(n_classes)
+    votes = one_hot.sum(axis=0)
+    # poradie modelu, ktorý ako prvý hlasoval za triedu; triedy bez maxima vyradíme
+    first_vote = np.where(one_hot.any(axis=0), one_hot.argmax(axis=0), n_estimators)
+    first_vote[votes < votes.max(axis=1, keepdims=True)] = n_estimators
+    return first_vote.argmin(axis=1)
+
+# tokenizované trénovacie dáta zdieľané procesmi, nastavené v _init_worker
+_shared_corpus = None
+
+def _init_worker(corpus):
+    """
+    Inicializácia procesu v poole: trénovacie dáta sa prenesú raz na proces, nie pre každý model.
+    """
+    global _shared_corpus
+    _shared_corpus = corpus
+
+def _fit_bootstrap(seed, corpus=None):
+    """
+    Natrénuje jeden základný model na bootstrap vzorke tokenizovaných dát.
+    Bootstrap vzorka je vektor násobností dokumentov (multinomický výber),
+    takže sa nekopírujú texty ani tokeny. Vzorka závisí iba od seed-u modelu,
+    preto výsledok nezávisí od počtu procesov.
+
+    Parameters
+    ----------
+    - seed: np.random.SeedSequence pre tento model
+    - corpus: (base_estimator, indptr, indices, data, y, vocab_index, max_samples),
+              ak None, použijú sa dáta zdieľané procesom
+
+    Returns
+    -------
+    - estimator: natrénovaný základný model
+    """
+    in_worker = corpus is None
+    base_estimator, indptr, indices, data, y, vocab_index, max_samples = _shared_corpus if in_worker else corpus
+    n_samples = len(indptr) - 1
+    rng = np.random.default_rng(seed)
+    sample_weight = rng.multinomial(max_samples, np.full(n_samples, 1.0 / n_samples))
+
+    estimator = base_estimator()
+    estimator.fit_encoded(indptr, indices, y, vocab_index, data=data, sample_weight=sample_weight)
+    if in_worker:
+        # slovník je spoločný, rodičovský proces ho modelu znova priradí
+        estimator.vocab_index = None
+    return estimator
 
 class BaggingClassifier:
     """
@@ -6,41 +79,105 @@ class BaggingClassifier:
     Vytvára viacero bootstrap vzoriek z trénovacích dát a pre každú vzorku
     natrénuje kópiu základného klasifikátora. Konečná predikcia je získaná hlasovaním.
     """
-    def __init__(self, base_estimator, n_estimators=10, max_samples=None):
+    def __init__(self, base_estimator, n_estimators=10, max_samples=None, n_jobs=1, random_state=None,
+                 tokenizer=None, n_features=None, min_df=1, max_vocab_size=None, stop_words=None,
+                 ngram_range=(1, 1), char_ngram_range=None):
         """
         Parameters
         ----------
         - base_estimator: Trieda základného klasifikátora (napr. SimpleNaiveBayesClassifier),
-                          ktorá musí mať metódy fit a predict.
+                          ktorá musí mať metódy fit_encoded a predict a po natrénovaní
+                          atribúty classes, vocab_index, log_priors a log_probs.
         - n_estimators: Počet základných modelov.
         - max_samples: Počet vzoriek použitých pre každú bootstrap vzorku.
                        Ak None, použije sa celý počet trénovacích dát.
+        - n_jobs: Počet procesov pre trénovanie modelov. 1 trénuje v aktuálnom procese,
+                  None alebo -1 použije všetky jadrá.
+        - random_state: Seed pre bootstrap vzorky. Každý model dostane vlastný odvodený
+                        generátor, takže výsledok nezávisí od n_jobs.
+        - tokenizer: funkcia text -> tokeny spoločná pre všetky modely,
+                     ak None, použije sa spoločný default_tokenizer.
+        - n_features: ak je zadané, namiesto slovníka sa slová hashujú do n_features
+                      stĺpcov (FeatureHasher), takže pamäť modelov je ohraničená
+                      počtom modelov x tried x n_features bez ohľadu na veľkosť korpusu.
+        - min_df: slová, ktoré sa vyskytujú v menej dokumentoch (int) alebo v menšom
+                  podiele dokumentov (float), sa po spočítaní vynechajú zo slovníka.
+        - max_vocab_size: najväčší počet slov spoločného slovníka (najčastejšie slová).
+        - stop_words: slová, ktoré sa nezaradia do slovníka.
+          Orezanie slovníka sa dá použiť iba so slovníkom, nie s n_features.
+        - ngram_range: (najmenšie, najväčšie) n slovných n-gramov, napr. (1, 2) pridá dvojice slov.
+        - char_ngram_range: (najmenšie, najväčšie) n znakových n-gramov, napr. (3, 5), alebo None.
+          N-gramy sa hashujú posuvným hashom (FeatureHasher), preto vyžadujú n_features.
         """
         self.base_estimator = base_estimator
         self.n_estimators = n_estimators
         self.max_samples = max_samples  # ak None, nastavíme v metóde fit
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.tokenizer = tokenizer
+        self.n_features = n_features
+        self.min_df = min_df
+        self.max_vocab_size = max_vocab_size
+        self.stop_words = frozenset(stop_words or ())
+        self.ngram_range = ngram_range
+        self.char_ngram_range = char_ngram_range
         self.estimators = []  # zoznam natrénovaných základných modelov
+        self.classes = []     # zjednotenie tried všetkých modelov
+        self.vocab_index = {} # spoločný slovník všetkých modelov
+        self.log_priors = None  # tenzor (modely x triedy)
+        self.log_probs = None   # tenzor (modely x triedy x slová + 1)
+        self.contributions = None  # trieda -> (počty hlasov, priemerné LLR) pre každé slovo
+        self.n_updates = 0      # počet volaní partial_fit
 
-    def _clone_estimator(self):
+    def tokenize(self, text):
         """
-        Vytvorí novú inštanciu základného klasifikátora.
-        Predpokladáme, že base_estimator je trieda, ktorú možno volať bez argumentov.
+        Tokenizácia textu spoločná pre všetky modely v ensemble.
+        """
+        return (getattr(self, "tokenizer", None) or default_tokenizer)(text)
+
+    def get_contribution_scores(self, text, positive_class=1):
+        """
+        Vráti slová textu, za ktoré hlasuje väčšina modelov ako za dôkaz pozitívnej triedy,
+        zoradené podľa priemerného logaritmického pomeru vierohodnosti (LLR).
+        Používa index predpočítaný pri trénovaní/načítaní, takže stojí jedno vyhľadanie na slovo.
+
+        Parameters
+        ----------
+        - text: vstupný text (komentár)
+        - positive_class: trieda, ktorej dôkazy hľadáme
 
         Returns
         -------
-        - self.base_estimator(): nová inštancia základného klasifikátora
+        - contributions: zoznam dvojíc (slovo, LLR skóre) zoradený od najvyššieho skóre
         """
-        return self.base_estimator()
+        self._ensure_compiled()
+        if positive_class not in self.contributions:
+            return []
+        votes, llr = self.contributions[positive_class]
+        oov = len(self.vocab_index)
+        contributions = []
+        for word in set(self.tokenize(text)):
+            idx = self.vocab_index.get(word, oov)
+            if votes[idx] > len(self.estimators) / 2:
+                contributions.append((word, float(llr[idx])))
+        contributions.sort(key=lambda item: item[1], reverse=True)
+        return contributions
 
-    # Inside bagging.py, add this method to the BaggingClassifier class
     def get_contributing_words(self, text, positive_class=1):
-        words = self.estimators[0].tokenize(text)
-        contributing = []
-        for word in set(words):
-            count = sum(1 for est in self.estimators if est._log_prob(word, positive_class) > est._log_prob(word, 1 - positive_class))
-            if count > len(self.estimators) / 2:
-                contributing.append(word)
-        return contributing
+        """
+        Vráti slová textu, ktoré väčšina modelov považuje za dôkaz pozitívnej triedy,
+        zoradené od najsilnejšieho.
+
+        Parameters
+        ----------
+        - text: vstupný text (komentár)
+        - positive_class: trieda, ktorej dôkazy hľadáme
+
+        Returns
+        -------
+        - contributing: zoznam slov
+        """
+        return [word for word, _ in self.get_contribution_scores(text, positive_class)]
 
     def fit(self, X, y):
         """
@@ -51,56 +188,442 @@ class BaggingClassifier:
         - X: Trénovacie dáta (zoznam textov).
         - y: Príslušné triedy (zoznam labelov).
         """
-        n_samples = len(X)
+        # texty sa tokenizujú raz do vektorov počtov slov nad spoločným slovníkom
+        with instrumentation.timer("fit.tokenize"):
+            tokens = [self.tokenize(text) for text in X]
+            n_features = getattr(self, "n_features", None)
+            vocab_index = make_vocab(tokens, n_features, getattr(self, "ngram_range", (1, 1)),
+                                     getattr(self, "char_ngram_range", None))
+            indptr, indices = encode(tokens, vocab_index, len(vocab_index))
+            indptr, indices, data = term_counts(indptr, indices, len(vocab_index))
+        if self._prunes_vocabulary():
+            if n_features:
+                raise ValueError("Vocabulary pruning cannot be combined with n_features")
+            with instrumentation.timer("fit.prune"):
+                vocab_index, indptr, indices, data = prune_vocab(
+                    vocab_index, indptr, indices, data, self.min_df, self.max_vocab_size, self.stop_words)
+        self.fit_encoded(indptr, indices, data, y, vocab_index)
+
+    def fit_encoded(self, indptr, indices, data, y, vocab_index):
+        """
+        Natrénuje ensemble na už tokenizovaných dokumentoch vo forme vektorov počtov slov
+        (výstup term_counts). Umožňuje opakovane trénovať na tých istých počtoch,
+        napr. pri krížovej validácii viacerých nastavení. Slovník sa tu už neorezáva.
+
+        Parameters
+        ----------
+        - indptr, indices, data: vektory počtov slov dokumentov v CSR tvare
+        - y: príslušné triedy
+        - vocab_index: slovník slovo -> index stĺpca (alebo FeatureHasher)
+        """
+        n_samples = len(indptr) - 1
         if self.max_samples is None:
             self.max_samples = n_samples
-        
-        self.estimators = []  # vyčistenie predchádzajúcich modelov
-        for _ in range(self.n_estimators):
-            # Vytvorenie bootstrap vzorky (náhodný výber s opakovaním)
-            indices = [random.randint(0, n_samples - 1) for _ in range(self.max_samples)]
-            X_sample = [X[idx] for idx in indices]
-            y_sample = [y[idx] for idx in indices]
-            
-            # Vytvorenie a trénovanie novej inštancie základného klasifikátora
-            estimator = self._clone_estimator()
-            estimator.fit(X_sample, y_sample)
-            self.estimators.append(estimator)
+        instrumentation.count("fit.documents", n_samples)
+        corpus = (self.base_estimator, indptr, indices, data, list(y), vocab_index, self.max_samples)
+        seeds = np.random.SeedSequence(self.random_state).spawn(self.n_estimators)
+
+        n_jobs = os.cpu_count() if self.n_jobs in (None, -1) else self.n_jobs
+        if n_jobs == 1:
+            self.estimators = []
+            for seed in seeds:
+                with instrumentation.timer("fit.estimator"):
+                    self.estimators.append(_fit_bootstrap(seed, corpus))
+        else:
+            # procesy poolu merania neposielajú, meria sa celé paralelné trénovanie
+            with instrumentation.timer("fit.estimators_parallel"), \
+                    ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(corpus,)) as pool:
+                self.estimators = list(pool.map(_fit_bootstrap, seeds))
+        for estimator in self.estimators:
+            estimator.vocab_index = vocab_index
+            estimator.tokenizer = self.tokenizer
+        with instrumentation.timer("fit.compile"):
+            self._compile()
+
+    def partial_fit(self, X, y):
+        """
+        Online bagging (Oza a Russell): každý model dostane každý nový dokument
+        s váhou z Poissonovho rozdelenia Poisson(1), čo v limite zodpovedá
+        bootstrap vzorkovaniu. Modely iba pripočítajú počty novej dávky, takže
+        čas aktualizácie závisí od veľkosti dávky, nie od celého korpusu.
+        Ak ensemble ešte nie je natrénovaný, prvá dávka sa natrénuje cez fit.
+        Nové slová sa pridajú do slovníka bez orezania (okrem stop slov).
+
+        Parameters
+        ----------
+        - X: nové texty (zoznam textov)
+        - y: ich triedy (zoznam labelov)
+        """
+        if not self.estimators:
+            self.fit(X, y)
+            return
+        self._ensure_compiled()
+        self._share_vocabulary()
+
+        tokens = [self.tokenize(text) for text in X]
+        stop_words = getattr(self, "stop_words", None)
+        if stop_words:
+            tokens = [[word for word in words if word not in stop_words] for words in tokens]
+        if not isinstance(self.vocab_index, FeatureHasher):
+            for words in tokens:
+                for word in words:
+                    self.vocab_index.setdefault(word, len(self.vocab_index))
+        indptr, indices = encode(tokens, self.vocab_index, len(self.vocab_index))
+        indptr, indices, data = term_counts(indptr, indices, len(self.vocab_index))
+
+        # každá aktualizácia má vlastný prúd náhodných čísel odvodený od random_state
+        self.n_updates = getattr(self, "n_updates", 0) + 1
+        random_state = getattr(self, "random_state", None)
+        rng = np.random.default_rng(None if random_state is None else [random_state, self.n_updates])
+        weights = rng.poisson(1.0, size=(len(self.estimators), len(X)))
+        for estimator, sample_weight in zip(self.estimators, weights):
+            estimator.partial_fit_encoded(indptr, indices, list(y), self.vocab_index,
+                                          data=data, sample_weight=sample_weight)
+        self._compile()
+
+    def distill(self, method="counts"):
+        """
+        Zlúči natrénovaný ensemble do jedného Naive Bayes modelu nad spoločným slovníkom,
+        takže predikcia stojí ako jeden model namiesto n_estimators.
+
+        Parameters
+        ----------
+        - method: "counts" - priemerné počty tried a slov všetkých modelov (pri bootstrap
+                  vzorkách približne model natrénovaný na všetkých dátach),
+                  "log_probs" - priemer logaritmických pravdepodobností modelov, ktoré triedu
+                  videli; skóre zlúčeného modelu je priemerné skóre modelov ensemble
+
+        Returns
+        -------
+        - model: BaggingClassifier s jedným zlúčeným modelom, ukladá sa a načítava ako ostatné modely
+        """
+        if method not in ("counts", "log_probs"):
+            raise ValueError("method must be 'counts' or 'log_probs'")
+        if not self.estimators:
+            raise ValueError("Cannot distill an ensemble that has not been fitted")
+        self._ensure_compiled()
+        self._share_vocabulary()
+        class_counts = np.zeros(len(self.classes))
+        feature_counts = np.zeros((len(self.classes), len(self.vocab_index)))
+        for estimator in self.estimators:
+            rows = [self.classes.index(label) for label in estimator.classes]
+            class_counts[rows] += [estimator.class_counts[label] for label in estimator.classes]
+            feature_counts[rows] += csr_to_dense(estimator.count_indptr, estimator.count_indices,
+                                                 estimator.count_data, len(self.vocab_index))
+        class_counts /= len(self.estimators)
+        feature_counts /= len(self.estimators)
+
+        merged = SimpleNaiveBayesClassifier(alpha=self.estimators[0].alpha, tokenizer=getattr(self, "tokenizer", None),
+                                            n_features=getattr(self, "n_features", None),
+                                            ngram_range=getattr(self, "ngram_range", (1, 1)),
+                                            char_ngram_range=getattr(self, "char_ngram_range", None))
+        merged.classes = list(self.classes)
+        merged.class_counts = dict(zip(merged.classes, class_counts.tolist()))
+        merged.total_docs = float(class_counts.sum())
+        merged.class_priors = {label: count / merged.total_docs for label, count in merged.class_counts.items()}
+        merged.vocab_index = self.vocab_index
+        merged.count_indptr, merged.count_indices, merged.count_data = csr_from_dense(feature_counts)
+        merged.vocab_size = int(np.count_nonzero(feature_counts.sum(axis=0)))
+        merged._compile()
+        if method == "log_probs":
+            # model, ktorý triedu nevidel (-inf), sa do priemeru pre túto triedu nezapočíta
+            seen = ~np.isneginf(self.log_priors)
+            n_seen = seen.sum(axis=0)
+            merged.log_priors = np.where(seen, self.log_priors, 0.0).sum(axis=0) / n_seen
+            merged.log_probs = np.where(seen[:, :, None], self.log_probs, 0.0).sum(axis=0) / n_seen[:, None]
+
+        model = BaggingClassifier(self.base_estimator, n_estimators=1, max_samples=self.max_samples,
+                                  random_state=getattr(self, "random_state", None),
+                                  tokenizer=getattr(self, "tokenizer", None),
+                                  n_features=getattr(self, "n_features", None), min_df=getattr(self, "min_df", 1),
+                                  max_vocab_size=getattr(self, "max_vocab_size", None),
+                                  stop_words=getattr(self, "stop_words", None),
+                                  ngram_range=getattr(self, "ngram_range", (1, 1)),
+                                  char_ngram_range=getattr(self, "char_ngram_range", None))
+        model.estimators = [merged]
+        model._compile()
+        return model
+
+    def _prunes_vocabulary(self):
+        return (getattr(self, "min_df", 1) != 1 or getattr(self, "max_vocab_size", None) is not None
+                or bool(getattr(self, "stop_words", None)))
+
+    def _share_vocabulary(self):
+        """
+        Prevedie modely, ktoré majú vlastné slovníky (napr. staršie uložené modely),
+        na spoločný slovník ensemble, aby sa dali spoločne aktualizovať a ukladať.
+        """
+        for estimator in self.estimators:
+            if estimator.vocab_index is self.vocab_index:
+                continue
+            columns = np.fromiter((self.vocab_index[word] for word in estimator.vocab_index),
+                                  dtype=np.int64, count=len(estimator.vocab_index))
+            # riedke počty stačí prečíslovať, netreba ich rozbaliť na celý spoločný slovník
+            estimator.count_indices = columns[estimator.count_indices]
+            estimator.vocab_index = self.vocab_index
+            estimator._compile()
+
+    def _ensure_compiled(self):
+        """
+        Modely uložené pred zavedením tenzora a indexu vysvetlení sa skompilujú pri prvom použití.
+        """
+        if getattr(self, "log_probs", None) is None:
+            self._compile()
+        elif getattr(self, "contributions", None) is None:
+            self._build_contributions()
+
+    def _compile(self):
+        """
+        Zlúči matice logaritmických pravdepodobností všetkých modelov nad spoločným
+        slovníkom do jedného tenzora, aby sa pri predikcii text tokenizoval
+        iba raz a všetky modely sa vyhodnotili jednou maticovou operáciou.
+        Slová, ktoré model nepozná, dostanú jeho pravdepodobnosť pre neznáme slovo;
+        triedy, ktoré model nevidel, dostanú -inf.
+        """
+        for estimator in self.estimators:
+            estimator._ensure_compiled()
+        self.classes = []
+        for estimator in self.estimators:
+            for label in estimator.classes:
+                if label not in self.classes:
+                    self.classes.append(label)
+        shared_vocab = self.estimators[0].vocab_index
+        if all(estimator.vocab_index is shared_vocab for estimator in self.estimators):
+            self.vocab_index = shared_vocab
+        else:
+            self.vocab_index = {}
+            for estimator in self.estimators:
+                for word in estimator.vocab_index:
+                    self.vocab_index.setdefault(word, len(self.vocab_index))
+
+        n_words = len(self.vocab_index)
+        shape = (len(self.estimators), len(self.classes))
+        self.log_priors = np.full(shape, -np.inf)
+        self.log_probs = np.full(shape + (n_words + 1,), -np.inf)
+        for e, estimator in enumerate(self.estimators):
+            # stĺpce modelu sú očíslované v poradí jeho slovníka
+            if estimator.vocab_index is self.vocab_index:
+                columns = slice(0, len(self.vocab_index))
+            else:
+                columns = np.fromiter((self.vocab_index[word] for word in estimator.vocab_index),
+                                      dtype=np.int64, count=len(estimator.vocab_index))
+            for row, label in enumerate(estimator.classes):
+                c = self.classes.index(label)
+                self.log_priors[e, c] = estimator.log_priors[row]
+                self.log_probs[e, c, :] = estimator.log_probs[row, -1]
+                self.log_probs[e, c, columns] = estimator.log_probs[row, :-1]
+        # modely nad spoločným slovníkom, ktoré poznajú prvé triedy ensemble v rovnakom poradí,
+        # používajú pohľad do tenzora namiesto vlastnej kópie matice
+        for e, estimator in enumerate(self.estimators):
+            if estimator.vocab_index is self.vocab_index and \
+                    self.classes[:len(estimator.classes)] == estimator.classes:
+                estimator.log_priors = self.log_priors[e, :len(estimator.classes)]
+                estimator.log_probs = self.log_probs[e, :len(estimator.classes)]
+        self._build_contributions()
+
+    def _class_log_probs(self, label):
+        """
+        Vráti log P(slovo | label) všetkých modelov tvaru (modely x slová + 1).
+        Model, ktorý triedu nevidel, má pre každé slovo log(1 / veľkosť slovníka),
+        rovnako ako SimpleNaiveBayesClassifier._log_prob.
+        """
+        if label not in self.classes:
+            rows = np.zeros((len(self.estimators), self.log_probs.shape[2]))
+            missing = np.ones(len(self.estimators), dtype=bool)
+        else:
+            c = self.classes.index(label)
+            rows = np.array(self.log_probs[:, c, :])
+            missing = np.isneginf(self.log_priors[:, c])
+        for e in np.flatnonzero(missing):
+            rows[e] = -math.log(self.estimators[e].vocab_size)
+        return rows
+
+    def _build_contributions(self):
+        """
+        Predpočíta pre každú triedu index vysvetlení: pre každé slovo počet modelov,
+        podľa ktorých slovo svedčí pre triedu viac ako pre opačnú (1 - trieda),
+        a priemerný logaritmický pomer vierohodnosti medzi týmito triedami.
+        """
+        self.contributions = {}
+        for label in self.classes:
+            try:
+                negative = 1 - label
+            except TypeError:
+                continue  # opačná trieda je definovaná iba pre binárne labely
+            ratios = self._class_log_probs(label) - self._class_log_probs(negative)
+            self.contributions[label] = (np.count_nonzero(ratios > 0, axis=0), ratios.mean(axis=0))
 
     def _majority_vote(self, predictions):
         """
-        Vráti triedu s najväčším počtom hlasov z daného zoznamu predikcií.
-        V prípade remízy vráti prvú z najčastejších tried.
+        Pre každý dokument vráti triedu s najväčším počtom hlasov.
+        V prípade remízy vráti triedu, za ktorú hlasoval skôr uvedený model.
 
         Parameters
         ----------
-        - predictions: zoznam predikcií (tried) od jednotlivých modelov.
+        - predictions: pole indexov tried tvaru (počet modelov, počet dokumentov)
 
         Returns
         -------
-        - pred: trieda s najväčším počtom hlasov
+        - pred: pole indexov víťazných tried (dĺžka počet dokumentov)
         """
-        vote_count = {}
-        for pred in predictions:
-            vote_count[pred] = vote_count.get(pred, 0) + 1
-        max_votes = max(vote_count.values())
-        for pred in predictions:
-            if vote_count[pred] == max_votes:
-                return pred
+        return majority_vote(predictions, len(self.classes))
 
-    def predict(self, X):
+    def predict(self, X, early_exit=False):
         """
         Vykoná predikciu na dátach X.
+        Texty sa tokenizujú raz a všetky modely sa vyhodnotia spoločne nad
+        zlúčeným tenzorom logaritmických pravdepodobností.
         
         Parameters
         ----------
         - X: dáta, pre ktoré chceme vykonať predikciu (zoznam textov).
+        - early_exit: ak True, dokument sa prestane vyhodnocovať, keď je víťaz hlasovania
+                      rozhodnutý aj pri ľubovoľných hlasoch zvyšných modelov (výsledok je rovnaký)
 
         Returns
         -------
         - aggregated_predictions: zoznam predikovaných tried získaných hlasovaním zo všetkých modelov.
         """
-        all_predictions = [estimator.predict(X) for estimator in self.estimators]
-        all_predictions = list(zip(*all_predictions))
-        aggregated_predictions = [self._majority_vote(preds) for preds in all_predictions]
-        return aggregated_predictions
\ No newline at end of file
+        self._ensure_compiled()
+        aggregated_predictions = []
+        for indptr, indices, batch in self._encode_batches(X):
+            aggregated_predictions.extend(self._predict_batch(indptr, indices, early_exit=early_exit))
+        return aggregated_predictions
+
+    def predict_proba(self, X):
+        """
+        Vráti pravdepodobnostný výstup ansámblu pre texty X.
+
+        Parameters
+        ----------
+        - X: zoznam textov
+
+        Returns
+        -------
+        - votes: pole tvaru (texty x triedy) v poradí self.classes, podiel modelov, ktoré hlasovali
+                 za triedu (násobky 1 / n_estimators)
+        - posteriors: pole tvaru (texty x triedy), priemer P(trieda | text) jednotlivých modelov
+                      vypočítaných v log-sum-exp tvare; trieda, ktorú model nevidel, má u neho 0
+        """
+        self._ensure_compiled()
+        votes, posteriors = [], []
+        for indptr, indices, batch in self._encode_batches(X):
+            with instrumentation.timer("predict.score"):
+                scores = self._score_batch(indptr, indices)
+            instrumentation.count("predict.estimator_evaluations", len(batch) * len(self.estimators))
+            one_hot = scores.argmax(axis=1)[:, :, None] == np.arange(len(self.classes))
+            votes.append(one_hot.mean(axis=0))
+            posteriors.append(np.exp(log_posteriors(scores, axis=1)).mean(axis=0).T)
+        if not votes:
+            return np.zeros((0, len(self.classes))), np.zeros((0, len(self.classes)))
+        return np.concatenate(votes), np.concatenate(posteriors)
+
+    def _encode_batches(self, X):
+        """
+        Tokenizuje texty po dávkach PREDICT_BATCH_SIZE a zakóduje ich nad self.vocab_index.
+
+        Returns
+        -------
+        - generátor trojíc (indptr, indices, texty dávky)
+        """
+        for start in range(0, len(X), PREDICT_BATCH_SIZE):
+            batch = X[start:start + PREDICT_BATCH_SIZE]
+            with instrumentation.timer("predict.tokenize"):
+                indptr, indices = encode([self.tokenize(text) for text in batch], self.vocab_index,
+                                         len(self.vocab_index))
+            if instrumentation.enabled:
+                instrumentation.count("predict.documents", len(batch))
+                instrumentation.count("predict.tokens", len(indices))
+                instrumentation.count("predict.oov_tokens", int(np.count_nonzero(indices == len(self.vocab_index))))
+            yield indptr, indices, batch
+
+    def predict_encoded(self, indptr, indices, data=None, early_exit=False):
+        """
+        Vykoná predikciu pre dokumenty už zakódované nad slovníkom self.vocab_index.
+
+        Parameters
+        ----------
+        - indptr, indices: dokumenty v CSR tvare (napr. z encode alebo term_counts)
+        - data: počty výskytov slov (ak None, každý záznam v indices je jeden výskyt)
+        - early_exit: ako v predict
+
+        Returns
+        -------
+        - predictions: zoznam predikovaných tried
+        """
+        self._ensure_compiled()
+        predictions = []
+        n_docs = len(indptr) - 1
+        for start in range(0, n_docs, PREDICT_BATCH_SIZE):
+            end = min(start + PREDICT_BATCH_SIZE, n_docs)
+            low, high = indptr[start], indptr[end]
+            predictions.extend(self._predict_batch(indptr[start:end + 1] - low, indices[low:high],
+                                                   None if data is None else data[low:high], early_exit))
+        return predictions
+
+    def _score_batch(self, indptr, indices, data=None, estimators=slice(None)):
+        """
+        Vráti skóre log P(trieda) + sum log P(slovo | trieda) tvaru (modely x triedy x dokumenty).
+        """
+        token_log_probs = self.log_probs[estimators][:, :, indices]
+        if data is not None:
+            token_log_probs = token_log_probs * data
+        return self.log_priors[estimators][:, :, None] + segment_sum(token_log_probs, indptr)
+
+    def _predict_batch(self, indptr, indices, data=None, early_exit=False):
+        """
+        Ohodnotí dávku zakódovaných dokumentov všetkými modelmi naraz a vráti víťazné triedy.
+        """
+        n_estimators = len(self.estimators)
+        if early_exit and n_estimators > 2 and len(self.classes) > 1:
+            return self._predict_batch_early_exit(indptr, indices, data)
+        with instrumentation.timer("predict.score"):
+            scores = self._score_batch(indptr, indices, data)
+        instrumentation.count("predict.estimator_evaluations", (len(indptr) - 1) * n_estimators)
+        with instrumentation.timer("predict.vote"):
+            winners = self._majority_vote(scores.argmax(axis=1))
+        return [self.classes[idx] for idx in winners]
+
+    def _predict_batch_early_exit(self, indptr, indices, data=None):
+        """
+        Hlasovanie s predčasným ukončením. Najprv sa naraz vyhodnotí najmenší počet modelov,
+        ktorý môže tvoriť väčšinu, potom ďalšie modely iba pre dokumenty, ktorých víťaz
+        ešte nie je istý (vždy toľko, koľko treba, aby sa mohol rozhodnúť aspoň jeden z nich).
+        Víťaz je istý, keď má viac hlasov ako ktorákoľvek iná trieda aj po pripočítaní
+        všetkých zvyšných modelov; nerozhodnuté dokumenty sa na konci vyhodnotia cez
+        _majority_vote, takže výsledok je rovnaký ako bez predčasného ukončenia.
+        """
+        n_estimators, n_classes = len(self.estimators), len(self.classes)
+        n_docs = len(indptr) - 1
+        predictions = np.empty((n_estimators, n_docs), dtype=np.int64)
+        votes = np.zeros((n_docs, n_classes), dtype=np.int64)
+        winners = np.empty(n_docs, dtype=np.int64)
+        active = np.arange(n_docs)
+        evaluated = 0
+        n_evaluations = 0
+        with instrumentation.timer("predict.score"):
+            stop = n_estimators // 2 + 1
+            while len(active) and evaluated < n_estimators:
+                chosen = self._score_batch(indptr, indices, data, slice(evaluated, stop)).argmax(axis=1)
+                predictions[evaluated:stop, active] = chosen
+                votes[active] += (chosen[:, :, None] == np.arange(n_classes)).sum(axis=0)
+                n_evaluations += (stop - evaluated) * len(active)
+                evaluated = stop
+                top_two = np.sort(votes[active], axis=1)[:, -2:]
+                margins = top_two[:, 1] - top_two[:, 0]
+                remaining = n_estimators - evaluated
+                decided = margins > remaining
+                if decided.any():
+                    winners[active[decided]] = votes[active[decided]].argmax(axis=1)
+                    undecided = np.flatnonzero(~decided)
+                    active = active[undecided]
+                    margins = margins[undecided]
+                    indptr, indices, data = take_rows(indptr, indices, data, undecided)
+                if len(active):
+                    # najmenší počet ďalších modelov, po ktorom môže byť rozhodnutý aspoň jeden dokument
+                    stop = evaluated + (remaining - int(margins.max())) // 2 + 1
+        instrumentation.count("predict.estimator_evaluations", n_evaluations)
+        with instrumentation.timer("predict.vote"):
+            if len(active):
+                winners[active] = self._majority_vote(predictions[:, active])
+        return [self.classes[idx] for idx in winners]
@@ -0,0 +1,155 @@
+import numpy as np
+from algorithm.bagging import PREDICT_BATCH_SIZE, majority_vote
+from algorithm.tokenizer import default_tokenizer
+from algorithm.sparse import encode, make_vocab, term_counts, token_docs, segment_sum
+
+class MultiLabelBaggingClassifier:
+    """
+    Bagging Naive Bayes klasifikátor pre viac binárnych labelov naraz
+    (napr. IsToxic, IsAbusive, IsProvocative, IsThreat...).
+    Všetky labely zdieľajú jeden slovník, jednu tokenizáciu a tie isté
+    bootstrap vzorky, takže trénovanie aj predikcia prejdú dáta iba raz.
+    Každý model a label zodpovedá binárnemu SimpleNaiveBayesClassifier.
+    """
+    def __init__(self, labels, n_estimators=10, max_samples=None, alpha=1.0, random_state=None, tokenizer=None,
+                 n_features=None, ngram_range=(1, 1), char_ngram_range=None):
+        """
+        Parameters
+        ----------
+        - labels: zoznam názvov labelov (stĺpcov)
+        - n_estimators: počet modelov v baggingu
+        - max_samples: počet vzoriek v bootstrap vzorke, ak None, použije sa celý počet dát
+        - alpha: parameter vyhladzovania
+        - random_state: seed pre bootstrap vzorky (rovnaké odvodenie ako v BaggingClassifier)
+        - tokenizer: funkcia text -> tokeny, ak None, použije sa spoločný default_tokenizer
+        - n_features: ak je zadané, slová sa hashujú do n_features stĺpcov namiesto slovníka
+        - ngram_range, char_ngram_range: slovné a znakové n-gramy ako v BaggingClassifier (vyžadujú n_features)
+        """
+        self.labels = list(labels)
+        self.n_estimators = n_estimators
+        self.max_samples = max_samples
+        self.alpha = alpha
+        self.random_state = random_state
+        self.tokenizer = tokenizer
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.char_ngram_range = char_ngram_range
+        self.vocab_index = {}           # spoločný slovník všetkých labelov a modelov
+        self.log_prior_ratios = None    # log P(1) - log P(0), tvar (labely x modely)
+        self.log_ratios = None          # log P(slovo | 1) - log P(slovo | 0), tvar (labely x modely x slová + 1)
+
+    def tokenize(self, text):
+        """
+        Tokenizácia textu rovnaká ako v SimpleNaiveBayesClassifier.
+        """
+        return (self.tokenizer or default_tokenizer)(text)
+
+    def fit(self, X, Y):
+        """
+        Natrénuje modely pre všetky labely v jednom prechode cez dáta.
+
+        Parameters
+        ----------
+        - X: zoznam textov (komentárov)
+        - Y: zoznam vektorov labelov (jeden binárny vektor na komentár v poradí self.labels)
+        """
+        Y = np.asarray(Y, dtype=bool).reshape(len(X), len(self.labels))
+        n_samples = len(X)
+        if self.max_samples is None:
+            self.max_samples = n_samples
+
+        tokens = [self.tokenize(text) for text in X]
+        self.vocab_index = make_vocab(tokens, getattr(self, "n_features", None), getattr(self, "ngram_range", (1, 1)),
+                                      getattr(self, "char_ngram_range", None))
+        n_words = len(self.vocab_index)
+        indptr, indices = encode(tokens, self.vocab_index, n_words)
+        indptr, indices, data = term_counts(indptr, indices, n_words)
+        docs = token_docs(indptr)
+        token_labels = Y[docs].T.astype(np.float64)  # (labely x tokeny)
+
+        shape = (len(self.labels), self.n_estimators)
+        self.log_prior_ratios = np.empty(shape)
+        self.log_ratios = np.empty(shape + (n_words + 1,))
+        seeds = np.random.SeedSequence(self.random_state).spawn(self.n_estimators)
+        for e, seed in enumerate(seeds):
+            # bootstrap vzorka ako násobnosť každého dokumentu
+            rng = np.random.default_rng(seed)
+            weights = rng.multinomial(self.max_samples, np.full(n_samples, 1.0 / n_samples)).astype(np.float64)
+            token_weights = weights[docs] * data
+            all_counts = np.bincount(indices, weights=token_weights, minlength=n_words)
+            # rovnako ako v SimpleNaiveBayesClassifier počítame iba slová z bootstrap vzorky
+            vocab_size = np.count_nonzero(all_counts)
+            docs_positive = weights @ Y
+            docs_negative = weights.sum() - docs_positive
+            for l in range(len(self.labels)):
+                positive = np.bincount(indices, weights=token_weights * token_labels[l], minlength=n_words)
+                negative = all_counts - positive
+                log_positive = self._log_probs(positive, vocab_size)
+                log_negative = self._log_probs(negative, vocab_size)
+                # trieda, ktorá sa vo vzorke nevyskytla, nemôže vyhrať
+                if docs_positive[l] == 0:
+                    log_positive[:] = -np.inf
+                if docs_negative[l] == 0:
+                    log_negative[:] = -np.inf
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    self.log_ratios[l, e] = log_positive - log_negative
+                    self.log_prior_ratios[l, e] = np.log(docs_positive[l]) - np.log(docs_negative[l])
+
+    def _log_probs(self, counts, vocab_size):
+        """
+        Vypočíta log P(slovo | trieda) s Laplaceovým vyhladzovaním,
+        posledná hodnota patrí neznámemu slovu.
+        """
+        counts = np.append(counts, 0.0)
+        return np.log((counts + self.alpha) / (counts.sum() + self.alpha * vocab_size))
+
+    def _decision(self, X):
+        """
+        Vráti pole hlasov modelov tvaru (labely x modely x dokumenty), True znamená pozitívnu triedu.
+        """
+        indptr, indices = encode([self.tokenize(text) for text in X], self.vocab_index, len(self.vocab_index))
+        scores = self.log_prior_ratios[:, :, None] + segment_sum(self.log_ratios[:, :, indices], indptr)
+        # skóre je rozdiel log P(1) - log P(0); pri nule vyhráva trieda 0, čo zodpovedá argmax
+        # nad [0, 1] (prvá trieda v poradí). Rozdiel sa môže zaokrúhliť inak ako dva samostatné
+        # súčty v SimpleNaiveBayesClassifier, takže tesné remízy sa s ním nemusia zhodovať.
+        return scores > 0
+
+    def predict(self, X):
+        """
+        Vykoná predikciu všetkých labelov naraz.
+
+        Parameters
+        ----------
+        - X: zoznam textov
+
+        Returns
+        -------
+        - predictions: zoznam vektorov labelov (jeden zoznam bool hodnôt na komentár)
+        """
+        predictions = []
+        for start in range(0, len(X), PREDICT_BATCH_SIZE):
+            votes = self._decision(X[start:start + PREDICT_BATCH_SIZE])
+            winners = np.stack([majority_vote(label_votes.astype(np.int64), 2) for label_votes in votes])
+            predictions.extend(winners.T.astype(bool).tolist())
+        return predictions
+
+    def get_contributing_words(self, text, label):
+        """
+        Vráti slová z textu, ktoré väčšina modelov považuje za dôkaz pozitívnej triedy daného labelu.
+
+        Parameters
+        ----------
+        - text: vstupný text (komentár)
+        - label: názov labelu
+
+        Returns
+        -------
+        - contributing: zoznam slov
+        """
+        l = self.labels.index(label)
+        contributing = []
+        for word in set(self.tokenize(text)):
+            idx = self.vocab_index.get(word, len(self.vocab_index))
+            if np.count_nonzero(self.log_ratios[l, :, idx] > 0) > self.n_estimators / 2:
+                contributing.append(word)
+        return contributing
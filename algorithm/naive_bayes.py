@@ -1,5 +1,26 @@
 import math
-import re
+import numpy as np
+from algorithm.tokenizer import default_tokenizer
+from algorithm.sparse import FeatureHasher, csr_from_dense, csr_to_dense, encode, make_vocab, token_docs, segment_sum
+
+def log_posteriors(scores, axis=0):
+    """
+    Normalizuje združené logaritmické vierohodnosti na log P(trieda | text)
+    stabilným log-sum-exp (odčíta sa maximum, takže exp nepretečie ani nepodtečie na nulu pre všetky triedy).
+
+    Parameters
+    ----------
+    - scores: pole log P(trieda) + sum log P(slovo | trieda), triedy pozdĺž osi axis
+    - axis: os tried
+
+    Returns
+    -------
+    - log_posteriors: pole rovnakého tvaru, exp pozdĺž osi axis sa sčíta na 1
+    """
+    peak = scores.max(axis=axis, keepdims=True)
+    with np.errstate(invalid="ignore"):
+        shifted = scores - peak  # triedy s -inf ostanú -inf
+    return shifted - np.log(np.exp(shifted).sum(axis=axis, keepdims=True))
 
 # -----------------------------------------------------------
 # Implementácia jednoduchého Naive Bayes klasifikátora pre text
@@ -9,33 +30,76 @@ class SimpleNaiveBayesClassifier:
     Jednoduchý Naive Bayes klasifikátor pre textové dáta.
     Používa bag-of-words prístup s Laplaceovým vyhladzovaním.
     """
-    def __init__(self, alpha=1.0):
+    def __init__(self, alpha=1.0, tokenizer=None, n_features=None, ngram_range=(1, 1), char_ngram_range=None):
         """
         Parameters
         ----------
         - alpha: parameter vyhladzovania
+        - tokenizer: funkcia text -> tokeny, ak None, použije sa spoločný default_tokenizer
+        - n_features: ak je zadané, slová sa namiesto slovníka hashujú do n_features stĺpcov
+                      (FeatureHasher), takže veľkosť modelu nezávisí od veľkosti korpusu
+        - ngram_range: (najmenšie, najväčšie) n slovných n-gramov, iné ako (1, 1) vyžaduje n_features
+        - char_ngram_range: (najmenšie, najväčšie) n znakových n-gramov alebo None, vyžaduje n_features
         - class_counts: počet výskytov jednotlivých tried
-        - word_counts: slovníky s počtami slov pre každú triedu
-        - total_words: celkový počet slov v každej triede
-        - vocab: množina unikátnych slov vo všetkých dokument
+        - count_indptr, count_indices, count_data: počty slov tried v riedkom tvare (CSR, riadok = trieda),
+          uložené sú iba slová, ktoré trieda videla, takže pamäť nerastie s veľkosťou spoločného slovníka
+        - vocab_index: slovník slovo -> index stĺpca (alebo FeatureHasher), môže byť zdieľaný viacerými modelmi
+        - vocab_size: počet unikátnych slov, ktoré model videl pri trénovaní
         """
         self.alpha = alpha           # parameter vyhladzovania
+        self.tokenizer = tokenizer   # None znamená spoločný default_tokenizer
+        self.n_features = n_features # None znamená slovník, inak počet hashovaných stĺpcov
+        self.ngram_range = ngram_range
+        self.char_ngram_range = char_ngram_range
         self.class_counts = {}       # počet výskytov jednotlivých tried
-        self.word_counts = {}        # slovníky s počtami slov pre každú triedu
-        self.total_words = {}        # celkový počet slov v každej triede
-        self.vocab = set()           # množina unikátnych slov vo všetkých dokumentoch
+        self.classes = []            # triedy v poradí, v akom sa objavili v dátach
+        self.vocab_index = {}        # slovo -> index stĺpca v matici log_probs
+        self.count_indptr = None     # počty slov tried v CSR tvare (riadok = trieda)
+        self.count_indices = None
+        self.count_data = None
+        self.vocab_size = 0          # počet unikátnych slov vo všetkých dokumentoch
+        self.log_priors = None       # logaritmy apriórnych pravdepodobností tried
+        self.log_probs = None        # matica log P(slovo | trieda), posledný stĺpec patrí neznámym slovám
+
+    def __setstate__(self, state):
+        # modely uložené s hustou maticou feature_counts sa prevedú na riedke počty
+        feature_counts = state.pop("feature_counts", None)
+        self.__dict__.update(state)
+        if feature_counts is not None:
+            self.count_indptr, self.count_indices, self.count_data = csr_from_dense(feature_counts)
 
     # Inside naive_bayes.py, add this method to the SimpleNaiveBayesClassifier class
     def _log_prob(self, word, label):
-        if label not in self.word_counts:
-            return math.log(self.alpha / (self.total_words.get(label, 0) + self.alpha * len(self.vocab)))
-        word_count = self.word_counts[label].get(word, 0)
-        total_words_label = self.total_words[label]
-        return math.log((word_count + self.alpha) / (total_words_label + self.alpha * len(self.vocab)))
+        self._ensure_compiled()
+        if label not in self.classes:
+            return math.log(self.alpha / (self.alpha * self.vocab_size))
+        return float(self.log_probs[self.classes.index(label), self.vocab_index.get(word, -1)])
+
+    def _ensure_compiled(self):
+        """
+        Modely uložené pred zavedením matíc sa skompilujú pri prvom použití.
+        Staršie modely mali počty slov uložené v slovníkoch word_counts a množine vocab.
+        """
+        if getattr(self, "log_probs", None) is not None or not self.class_counts:
+            return
+        if getattr(self, "count_indptr", None) is None:
+            self.classes = list(self.class_counts)
+            self.vocab_index = {word: idx for idx, word in enumerate(self.vocab)}
+            self.vocab_size = len(self.vocab_index)
+            self.count_indptr = np.zeros(len(self.classes) + 1, dtype=np.int64)
+            np.cumsum([len(self.word_counts[label]) for label in self.classes], out=self.count_indptr[1:])
+            self.count_indices = np.fromiter((self.vocab_index[word] for label in self.classes
+                                              for word in self.word_counts[label]),
+                                             dtype=np.int64, count=self.count_indptr[-1])
+            self.count_data = np.fromiter((count for label in self.classes
+                                           for count in self.word_counts[label].values()),
+                                          dtype=np.float64, count=self.count_indptr[-1])
+        self._compile()
 
     def tokenize(self, text):
         """
         Tokenizácia textu: prevod na malé písmená, odstránenie interpunkcie a rozdelenie podľa medzier.
+        Samotnú tokenizáciu aj cache zabezpečuje tokenizér zdieľaný s ostatnými modelmi.
 
         Parameters
         ----------
@@ -43,57 +107,167 @@ class SimpleNaiveBayesClassifier:
 
         Returns
         -------
-        - text.split(): zoznam tokenov (slov)
+        - tokens: n-tica tokenov (slov)
         """
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', '', text)
-        return text.split()
+        return (getattr(self, "tokenizer", None) or default_tokenizer)(text)
 
     def fit(self, X, y):
         """
         Natrénuje Naive Bayes klasifikátor.
-        
+
         Parameters
         ----------
         - X: zoznam textov (komentárov)
         - y: zoznam príslušných tried (napr. 0 - netoxický, 1 - toxický)
         """
-        for text, label in zip(X, y):
-            if label not in self.class_counts:
-                self.class_counts[label] = 0
-                self.word_counts[label] = {}
-                self.total_words[label] = 0
-            self.class_counts[label] += 1
-            words = self.tokenize(text)
-            for word in words:
-                self.vocab.add(word)
-                self.word_counts[label][word] = self.word_counts[label].get(word, 0) + 1
-                self.total_words[label] += 1
-        self.total_docs = len(X)
+        tokens = [self.tokenize(text) for text in X]
+        vocab_index = make_vocab(tokens, *self._feature_params())
+        indptr, indices = encode(tokens, vocab_index, len(vocab_index))
+        self.fit_encoded(indptr, indices, y, vocab_index)
+
+    def _feature_params(self):
+        # staršie uložené modely nemajú parametre n-gramov
+        return (getattr(self, "n_features", None), getattr(self, "ngram_range", (1, 1)),
+                getattr(self, "char_ngram_range", None))
+
+    def fit_encoded(self, indptr, indices, y, vocab_index, data=None, sample_weight=None):
+        """
+        Natrénuje klasifikátor na už tokenizovaných dokumentoch v CSR tvare.
+        Umožňuje viacerým modelom zdieľať jeden slovník a jednu tokenizáciu.
+        Počty slov tried sú váženým súčtom vektorov počtov slov dokumentov.
+
+        Parameters
+        ----------
+        - indptr: začiatky dokumentov v poli indices (dĺžka n_docs + 1)
+        - indices: indexy slov zo slovníka vocab_index
+        - y: zoznam príslušných tried
+        - vocab_index: slovník slovo -> index stĺpca
+        - data: počty výskytov slov (ak None, každý záznam v indices je jeden výskyt)
+        - sample_weight: násobnosť každého dokumentu (napr. z bootstrap vzorky),
+                         dokumenty s váhou 0 sa ignorujú
+        """
+        self.classes = []
+        self.class_counts = {}
+        self.count_indptr = self.count_indices = self.count_data = None
+        self.total_docs = 0.0
+        self.partial_fit_encoded(indptr, indices, y, vocab_index, data=data, sample_weight=sample_weight)
+
+    def partial_fit(self, X, y):
+        """
+        Dotrénuje klasifikátor na ďalšej dávke textov. Keďže model je založený na počtoch,
+        aktualizácia iba pripočíta počty dávky, staršie dáta netreba znova spracovať.
+        Nové slová sa pridajú do slovníka modelu (pri modeloch v BaggingClassifier,
+        ktoré zdieľajú slovník, treba použiť BaggingClassifier.partial_fit).
+
+        Parameters
+        ----------
+        - X: zoznam textov (komentárov)
+        - y: zoznam príslušných tried
+        """
+        self._ensure_compiled()
+        tokens = [self.tokenize(text) for text in X]
+        if getattr(self, "count_indptr", None) is None:
+            self.vocab_index = make_vocab((), *self._feature_params())
+        vocab_index = self.vocab_index if self.vocab_index is not None else {}
+        if not isinstance(vocab_index, FeatureHasher):
+            for words in tokens:
+                for word in words:
+                    vocab_index.setdefault(word, len(vocab_index))
+        indptr, indices = encode(tokens, vocab_index, len(vocab_index))
+        self.partial_fit_encoded(indptr, indices, y, vocab_index)
+
+    def partial_fit_encoded(self, indptr, indices, y, vocab_index, data=None, sample_weight=None):
+        """
+        Pripočíta k modelu počty z ďalších tokenizovaných dokumentov v CSR tvare.
+        Slovník vocab_index môže oproti predchádzajúcemu volaniu obsahovať nové slová
+        (na konci), nové triedy sa pridajú za existujúce.
+
+        Parameters
+        ----------
+        - indptr, indices, y, vocab_index, data, sample_weight: ako vo fit_encoded
+        """
+        n_docs = len(indptr) - 1
+        weights = np.ones(n_docs) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+        labels = list(dict.fromkeys(y))
+        label_ids = {label: idx for idx, label in enumerate(labels)}
+        codes = np.fromiter((label_ids[label] for label in y), dtype=np.int64, count=n_docs)
+
+        # triedy, ktoré nemajú v dávke žiadny dokument, sa nepridávajú
+        class_weights = np.bincount(codes, weights=weights, minlength=len(labels))
+        for label, weight in zip(labels, class_weights):
+            if weight > 0 and label not in self.class_counts:
+                self.classes.append(label)
+                self.class_counts[label] = 0.0
+        if not self.classes:
+            return
+        rows = np.array([self.classes.index(label) if label in self.class_counts else 0 for label in labels],
+                        dtype=np.int64)
+        codes = rows[codes]
+        n_classes, n_words = len(self.classes), len(vocab_index)
+
+        # počty slov pre všetky triedy naraz: riadok = trieda, stĺpec = slovo; hustá matica
+        # je iba dočasná, model si ponechá riedke počty (nové triedy a slová pribúdajú na konci)
+        docs = token_docs(indptr)
+        token_weights = weights[docs] if data is None else weights[docs] * data
+        flat = codes[docs] * n_words + indices
+        counts = np.bincount(flat, weights=token_weights, minlength=n_classes * n_words).reshape(n_classes, n_words)
+        if getattr(self, "count_indptr", None) is not None:
+            csr_to_dense(self.count_indptr, self.count_indices, self.count_data, n_words,
+                         out=counts[:len(self.count_indptr) - 1])
+        self.count_indptr, self.count_indices, self.count_data = csr_from_dense(counts)
+        self.vocab_index = vocab_index
+        self.vocab_size = len(np.unique(self.count_indices))
+
+        for label, weight in zip(labels, class_weights.tolist()):
+            if weight > 0:
+                self.class_counts[label] += weight
+        self.total_docs = getattr(self, "total_docs", 0.0) + float(weights.sum())
         self.class_priors = {label: count / self.total_docs for label, count in self.class_counts.items()}
+        self._compile()
+
+    def _compile(self):
+        """
+        Vypočíta z riedkych počtov logaritmické pravdepodobnosti tvaru (počet tried, počet slov + 1).
+        Posledný stĺpec obsahuje pravdepodobnosť slova, ktoré trieda nevidela pri trénovaní.
+        """
+        counts = csr_to_dense(self.count_indptr, self.count_indices, self.count_data, len(self.vocab_index) + 1)
+        totals = counts.sum(axis=1)
+        self.log_probs = np.log((counts + self.alpha) / (totals + self.alpha * self.vocab_size)[:, None])
+        self.log_priors = np.log([self.class_priors[label] for label in self.classes])
 
     def predict(self, X):
         """
         Vykoná predikciu tried pre zoznam textov.
-        
+
         Parameters
         ----------
         - X: zoznam textov
-        
+
         Returns
         -------
         - predictions: zoznam predikovaných tried
         """
-        predictions = []
-        for text in X:
-            words = self.tokenize(text)
-            class_scores = {}
-            for label in self.class_counts:
-                score = math.log(self.class_priors[label])
-                for word in words:
-                    word_count = self.word_counts[label].get(word, 0)
-                    score += math.log((word_count + self.alpha) / (self.total_words[label] + self.alpha * len(self.vocab)))
-                class_scores[label] = score
-            predicted = max(class_scores, key=class_scores.get)
-            predictions.append(predicted)
-        return predictions
\ No newline at end of file
+        scores = self._joint_log_likelihood(X)
+        return [self.classes[idx] for idx in np.argmax(scores, axis=0)]
+
+    def predict_proba(self, X):
+        """
+        Vráti aposteriórne pravdepodobnosti tried pre zoznam textov.
+
+        Parameters
+        ----------
+        - X: zoznam textov
+
+        Returns
+        -------
+        - probabilities: pole tvaru (texty x triedy) v poradí self.classes, riadky sa sčítajú na 1
+        """
+        return np.exp(log_posteriors(self._joint_log_likelihood(X), axis=0)).T
+
+    def _joint_log_likelihood(self, X):
+        """
+        Vráti log P(trieda) + sum log P(slovo | trieda) tvaru (triedy x texty).
+        """
+        self._ensure_compiled()
+        indptr, indices = encode([self.tokenize(text) for text in X], self.vocab_index, len(self.vocab_index))
+        return self.log_priors[:, None] + segment_sum(self.log_probs[:, indices], indptr)
@@ -0,0 +1,388 @@
+import numpy as np
+
+# -----------------------------------------------------------
+# Pomocné funkcie pre riedku (CSR) reprezentáciu dokumentov
+# -----------------------------------------------------------
+def build_vocab(token_lists):
+    """
+    Vytvorí slovník slovo -> index v poradí prvého výskytu.
+
+    Parameters
+    ----------
+    - token_lists: zoznam zoznamov tokenov
+
+    Returns
+    -------
+    - vocab_index: slovník slovo -> index stĺpca
+    """
+    vocab_index = {}
+    for tokens in token_lists:
+        for token in tokens:
+            if token not in vocab_index:
+                vocab_index[token] = len(vocab_index)
+    return vocab_index
+
+def make_vocab(token_lists, n_features=None, ngram_range=(1, 1), char_ngram_range=None):
+    """
+    Vytvorí slovník pre trénovanie: FeatureHasher, ak je zadané n_features, inak slovník slov.
+
+    Parameters
+    ----------
+    - token_lists: zoznam zoznamov tokenov
+    - n_features: počet hashovaných stĺpcov alebo None
+    - ngram_range, char_ngram_range: n-gramy ako vo FeatureHasher, vyžadujú n_features
+
+    Returns
+    -------
+    - vocab_index: slovník slovo -> index stĺpca alebo FeatureHasher
+    """
+    if n_features:
+        return FeatureHasher(n_features, ngram_range, char_ngram_range)
+    if tuple(ngram_range) != (1, 1) or char_ngram_range is not None:
+        raise ValueError("N-gram features require n_features")
+    return build_vocab(token_lists)
+
+def encode(token_lists, vocab_index, oov_index):
+    """
+    Zakóduje tokenizované dokumenty do CSR tvaru (indptr, indices).
+    Tokeny dokumentu i sú uložené v indices[indptr[i]:indptr[i + 1]].
+
+    Parameters
+    ----------
+    - token_lists: zoznam zoznamov tokenov
+    - vocab_index: slovník slovo -> index stĺpca alebo FeatureHasher
+    - oov_index: index, ktorý dostanú slová mimo slovníka
+
+    Returns
+    -------
+    - indptr: začiatky dokumentov v poli indices (dĺžka n_docs + 1)
+    - indices: indexy tokenov všetkých dokumentov za sebou
+    """
+    if isinstance(vocab_index, FeatureHasher):
+        return vocab_index.encode(token_lists)
+    n_docs = len(token_lists)
+    indptr = np.zeros(n_docs + 1, dtype=np.int64)
+    np.cumsum([len(tokens) for tokens in token_lists], out=indptr[1:])
+    get = vocab_index.get
+    indices = np.fromiter((get(token, oov_index) for tokens in token_lists for token in tokens),
+                          dtype=np.int64, count=int(indptr[-1]))
+    return indptr, indices
+
+def prune_vocab(vocab_index, indptr, indices, data, min_df=1, max_vocab_size=None, stop_words=None):
+    """
+    Zmenší slovník po spočítaní slov: odstráni slová s malou dokumentovou frekvenciou,
+    stop slová a ponechá najviac max_vocab_size najčastejších slov. Odstránené slová
+    sa vynechajú aj z dokumentov, pri predikcii sa s nimi zaobchádza ako s neznámymi.
+
+    Parameters
+    ----------
+    - vocab_index: slovník slovo -> index stĺpca
+    - indptr, indices, data: vektory počtov slov dokumentov z term_counts
+    - min_df: najmenší počet dokumentov so slovom (int) alebo ich podiel (float)
+    - max_vocab_size: najväčší počet slov, ak None, neobmedzený
+    - stop_words: slová, ktoré sa do slovníka nezaradia
+
+    Returns
+    -------
+    - vocab_index: nový slovník s indexmi v pôvodnom poradí slov
+    - indptr, indices, data: dokumenty prevedené na nový slovník
+    """
+    n_words = len(vocab_index)
+    df = np.bincount(indices, minlength=n_words)
+    if isinstance(min_df, float):
+        min_df = int(np.ceil(min_df * (len(indptr) - 1)))
+    keep = df >= min_df
+    for word in stop_words or ():
+        idx = vocab_index.get(word)
+        if idx is not None:
+            keep[idx] = False
+    if max_vocab_size is not None and np.count_nonzero(keep) > max_vocab_size:
+        # pri rovnakej frekvencii má prednosť skôr videné slovo
+        kept = np.flatnonzero(keep)
+        top = kept[np.argsort(-df[kept], kind="stable")[:max_vocab_size]]
+        keep[:] = False
+        keep[top] = True
+
+    new_ids = np.full(n_words, -1, dtype=np.int64)
+    new_ids[keep] = np.arange(np.count_nonzero(keep))
+    words = list(vocab_index)
+    pruned_vocab = {words[idx]: new for new, idx in enumerate(np.flatnonzero(keep).tolist())}
+    mapped = new_ids[indices]
+    present = mapped >= 0
+    pruned_indptr = np.zeros(len(indptr), dtype=np.int64)
+    np.cumsum(segment_sum(present.astype(np.float64), indptr).astype(np.int64), out=pruned_indptr[1:])
+    return pruned_vocab, pruned_indptr, mapped[present], data[present]
+
+def token_docs(indptr):
+    """
+    Vráti pre každý token index dokumentu, do ktorého patrí.
+
+    Parameters
+    ----------
+    - indptr: začiatky dokumentov (dĺžka n_docs + 1)
+
+    Returns
+    -------
+    - docs: pole indexov dokumentov (dĺžka n_tokens)
+    """
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+def term_counts(indptr, indices, n_words):
+    """
+    Zlúči opakované tokeny v každom dokumente na dvojice (slovo, počet),
+    t.j. vytvorí riedke vektory počtov slov jednotlivých dokumentov.
+
+    Parameters
+    ----------
+    - indptr: začiatky dokumentov (dĺžka n_docs + 1)
+    - indices: indexy tokenov všetkých dokumentov za sebou
+    - n_words: veľkosť slovníka (najväčší index + 1)
+
+    Returns
+    -------
+    - indptr: začiatky dokumentov v nových poliach
+    - indices: indexy slov, v rámci dokumentu unikátne a zoradené
+    - data: počty výskytov slov
+    """
+    keys, data = np.unique(token_docs(indptr) * n_words + indices, return_counts=True)
+    docs = keys // n_words
+    counts_indptr = np.zeros(len(indptr), dtype=np.int64)
+    np.cumsum(np.bincount(docs, minlength=len(indptr) - 1), out=counts_indptr[1:])
+    return counts_indptr, keys % n_words, data
+
+def take_rows(indptr, indices, data, rows):
+    """
+    Vyberie zo CSR dokumentov zadané riadky (napr. trénovaciu časť pri krížovej validácii).
+
+    Parameters
+    ----------
+    - indptr, indices, data: dokumenty v CSR tvare (data môže byť None)
+    - rows: indexy vybraných dokumentov
+
+    Returns
+    -------
+    - indptr, indices, data: vybrané dokumenty v danom poradí
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    lengths = indptr[rows + 1] - indptr[rows]
+    new_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_indptr[1:])
+    # pozícia každého vybraného tokenu v pôvodných poliach
+    positions = np.repeat(indptr[rows] - new_indptr[:-1], lengths) + np.arange(new_indptr[-1])
+    return new_indptr, indices[positions], None if data is None else data[positions]
+
+def segment_sum(values, indptr):
+    """
+    Sčíta hodnoty po segmentoch (dokumentoch) pozdĺž poslednej osi.
+    Ekvivalent súčinu riedkej matice dokumentov s maticou váh.
+
+    Parameters
+    ----------
+    - values: pole tvaru (..., n_tokens)
+    - indptr: začiatky segmentov (dĺžka n_docs + 1)
+
+    Returns
+    -------
+    - sums: pole tvaru (..., n_docs)
+    """
+    n_docs = len(indptr) - 1
+    sums = np.zeros(values.shape[:-1] + (n_docs,), dtype=np.float64)
+    if values.shape[-1] == 0 or n_docs == 0:
+        return sums
+    starts = indptr[:-1]
+    non_empty = indptr[1:] > starts
+    # reduceat nevie spracovať prázdne segmenty, preto ich vynecháme
+    sums[..., non_empty] = np.add.reduceat(values, starts[non_empty], axis=-1)
+    return sums
+
+def csr_from_dense(matrix):
+    """
+    Prevedie hustú maticu na CSR (iba nenulové hodnoty).
+
+    Parameters
+    ----------
+    - matrix: 2D pole
+
+    Returns
+    -------
+    - indptr, indices, data: riadky matice v CSR tvare, indexy v riadku sú zoradené
+      (int32, ak sa počet stĺpcov zmestí, rovnako ako v súbore modelu)
+    """
+    matrix = np.asarray(matrix)
+    rows, indices = np.nonzero(matrix)
+    indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=matrix.shape[0]), out=indptr[1:])
+    index_dtype = np.int32 if matrix.shape[1] < 2 ** 31 else np.int64
+    return indptr, indices.astype(index_dtype), matrix[rows, indices]
+
+def csr_to_dense(indptr, indices, data, n_columns, out=None):
+    """
+    Rozbalí CSR riadky do hustej matice (alebo ich pripočíta k matici out).
+
+    Parameters
+    ----------
+    - indptr, indices, data: riadky v CSR tvare
+    - n_columns: počet stĺpcov výslednej matice
+    - out: matica, ku ktorej sa hodnoty pripočítajú, ak None, vytvorí sa nulová
+
+    Returns
+    -------
+    - matrix: hustá matica tvaru (počet riadkov, n_columns) alebo out
+    """
+    if out is None:
+        out = np.zeros((len(indptr) - 1, n_columns), dtype=np.float64)
+    np.add.at(out, (token_docs(indptr), indices), data)
+    return out
+
+# -----------------------------------------------------------
+# Hashovanie tokenov do pevného počtu stĺpcov
+# -----------------------------------------------------------
+_HASH_BASE = np.uint64(0x100000001B3)
+_CHAR_SALT = 0x9E3779B97F4A7C15  # oddelí znakové n-gramy od slov a slovných n-gramov
+_hash_powers = np.ones(1, dtype=np.uint64)
+
+def _powers(n):
+    """
+    Vráti mocniny základu polynomiálneho hashu 0..n-1 (modulo 2^64).
+    """
+    global _hash_powers
+    if len(_hash_powers) < n:
+        powers = np.full(max(n, 2 * len(_hash_powers)), _HASH_BASE, dtype=np.uint64)
+        powers[0] = 1
+        _hash_powers = np.cumprod(powers, dtype=np.uint64)
+    return _hash_powers[:n]
+
+def _mix(hashes):
+    # finalizácia splitmix64, rozptýli aj podobné reťazce po všetkých bitoch
+    hashes = hashes ^ (hashes >> np.uint64(30))
+    hashes = hashes * np.uint64(0xBF58476D1CE4E5B9)
+    hashes = hashes ^ (hashes >> np.uint64(27))
+    hashes = hashes * np.uint64(0x94D049BB133111EB)
+    return hashes ^ (hashes >> np.uint64(31))
+
+def hash_tokens(tokens):
+    """
+    Vypočíta 64-bitové hashe tokenov naraz, bez cyklu v Pythone cez tokeny.
+    Tokeny sa spoja do jedného UTF-32 poľa znakov a hash každého tokenu je
+    polynomiálny hash jeho znakov. Na rozdiel od vstavaného hash() je výsledok
+    rovnaký vo všetkých procesoch a behoch.
+
+    Parameters
+    ----------
+    - tokens: zoznam tokenov (reťazcov)
+
+    Returns
+    -------
+    - hashes: pole uint64 (dĺžka počet tokenov)
+    """
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    hashes = np.zeros(len(tokens), dtype=np.uint64)
+    if lengths.sum() == 0:
+        return _mix(hashes)
+    chars = np.frombuffer("".join(tokens).encode("utf-32-le", "surrogatepass"), dtype=np.uint32).astype(np.uint64)
+    ends = np.cumsum(lengths)
+    # znak na pozícii k od konca tokenu sa násobí základom na k-tu
+    positions = np.repeat(ends, lengths) - 1 - np.arange(len(chars))
+    values = (chars + np.uint64(1)) * _powers(int(lengths.max()))[positions]
+    starts = ends - lengths
+    non_empty = lengths > 0
+    hashes[non_empty] = np.add.reduceat(values, starts[non_empty])
+    return _mix(hashes ^ lengths.astype(np.uint64))
+
+class FeatureHasher:
+    """
+    Náhrada slovníka slovo -> index: token sa hashuje do jedného z n_features stĺpcov.
+    Počet stĺpcov a teda veľkosť matíc modelov nezávisí od veľkosti korpusu,
+    za cenu občasných kolízií slov v jednom stĺpci. Neznáme slová neexistujú,
+    každé slovo padne do niektorého stĺpca.
+
+    Voliteľne pridáva slovné n-gramy a znakové n-gramy. Ich hashe sa skladajú
+    posuvne (rolling hash) z hashov slov, resp. z kódov znakov, pre všetky
+    dokumenty naraz, takže sa nevytvárajú žiadne reťazce n-gramov. Znakové n-gramy
+    sa počítajú z tokenov dokumentu spojených bez medzier: "i d i o t" tak zdieľa
+    znakové n-gramy s "idiot" a "f*ck" (po odstránení interpunkcie "fck") s "fcking".
+    """
+    def __init__(self, n_features=2 ** 18, ngram_range=(1, 1), char_ngram_range=None):
+        """
+        Parameters
+        ----------
+        - n_features: počet stĺpcov (košov)
+        - ngram_range: (najmenšie, najväčšie) n slovných n-gramov, (1, 1) sú iba slová
+        - char_ngram_range: (najmenšie, najväčšie) n znakových n-gramov, None ich vypne
+        """
+        for bounds in (ngram_range, char_ngram_range):
+            if bounds is not None and not 1 <= bounds[0] <= bounds[1]:
+                raise ValueError(f"Invalid n-gram range {tuple(bounds)}")
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.char_ngram_range = None if char_ngram_range is None else tuple(char_ngram_range)
+
+    def __setstate__(self, state):
+        # staršie uložené hashery nemajú parametre n-gramov
+        self.__init__(**state)
+
+    def __len__(self):
+        return self.n_features
+
+    def encode(self, token_lists):
+        """
+        Zakóduje tokenizované dokumenty do CSR tvaru, rovnako ako encode.
+
+        Returns
+        -------
+        - indptr: začiatky dokumentov v poli indices
+        - indices: indexy stĺpcov tokenov (a n-gramov) všetkých dokumentov za sebou
+        """
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        tokens = [token for doc in token_lists for token in doc]
+        hashes = hash_tokens(tokens)
+        if self.ngram_range == (1, 1) and self.char_ngram_range is None:
+            indptr = np.zeros(len(token_lists) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=indptr[1:])
+            return indptr, (hashes % np.uint64(self.n_features)).astype(np.int64)
+
+        doc_ids = np.arange(len(token_lists))
+        features, feature_docs = [], []
+        low, high = self.ngram_range
+        if low == 1:
+            features.append(hashes)
+            feature_docs.append(np.repeat(doc_ids, lengths))
+        self._add_ngrams(features, feature_docs, hashes, np.repeat(doc_ids, lengths), max(low, 2), high, 0)
+        if self.char_ngram_range is not None:
+            texts = ["".join(doc) for doc in token_lists]
+            chars = np.frombuffer("".join(texts).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+            char_docs = np.repeat(doc_ids, np.fromiter(map(len, texts), dtype=np.int64, count=len(texts)))
+            self._add_ngrams(features, feature_docs, chars.astype(np.uint64) + np.uint64(1), char_docs,
+                             *self.char_ngram_range, _CHAR_SALT)
+
+        docs = np.concatenate(feature_docs) if feature_docs else np.zeros(0, dtype=np.int64)
+        order = np.argsort(docs, kind="stable")
+        indptr = np.zeros(len(token_lists) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(docs, minlength=len(token_lists)), out=indptr[1:])
+        values = np.concatenate(features)[order] if features else np.zeros(0, dtype=np.uint64)
+        return indptr, (values % np.uint64(self.n_features)).astype(np.int64)
+
+    @staticmethod
+    def _add_ngrams(features, feature_docs, units, unit_docs, low, high, salt):
+        """
+        Pridá hashe n-gramov dĺžky low..high z postupnosti units (hashe slov alebo kódy znakov).
+        Hash n-gramu vznikne z hashu (n-1)-gramu jedným násobením a sčítaním;
+        n-gramy, ktoré prekračujú hranicu dokumentu, sa vynechajú.
+        """
+        rolling = units
+        for n in range(1, high + 1):
+            if n > 1:
+                rolling = rolling[:-1] * _HASH_BASE + units[n - 1:]
+            if n < low:
+                continue
+            valid = unit_docs[:len(rolling)] == unit_docs[n - 1:]
+            features.append(_mix((rolling[valid] ^ np.uint64(n)) + np.uint64(salt)))
+            feature_docs.append(unit_docs[:len(rolling)][valid])
+
+    def get(self, word, default=None):
+        """
+        Vráti stĺpec slova (rozhranie zhodné so slovníkom).
+        """
+        return int(hash_tokens([word])[0] % np.uint64(self.n_features))
+
+    __getitem__ = get
@@ -0,0 +1,124 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+# -----------------------------------------------------------
+# Tokenizér zdieľaný všetkými modelmi
+# -----------------------------------------------------------
+_PUNCTUATION = re.compile(r'[^\w\s]')
+# pre ASCII texty je str.translate výrazne rýchlejší ako regulárny výraz;
+# tabuľku odvodíme priamo z regulárneho výrazu, aby sa výsledky zhodovali
+_ASCII_PUNCTUATION = str.maketrans("", "", "".join(c for c in map(chr, range(128)) if _PUNCTUATION.match(c)))
+
+# krátky zoznam anglických funkčných slov pre orezanie slovníka (stop_words);
+# zámená ako "you" chýbajú zámerne, pri toxických komentároch nesú informáciu
+ENGLISH_STOP_WORDS = frozenset("""
+a an the and or but if then so of to in on at by for with from as is are was were be been
+being it its this that these those there here i me my we our us he him his she her they
+them their do does did have has had not no just than too very can will would should
+""".split())
+
+class Tokenizer:
+    """
+    Tokenizácia textu: prevod na malé písmená, odstránenie interpunkcie a rozdelenie podľa medzier.
+    Výsledky sa ukladajú do LRU cache ohraničenej veľkosti s kľúčom podľa hashu textu,
+    takže opakované texty (spam, kopírované komentáre) sa tokenizujú iba raz.
+    """
+    def __init__(self, cache_size=100000):
+        """
+        Parameters
+        ----------
+        - cache_size: najväčší počet textov v cache (0 cache vypne)
+        """
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # cache a zámok sa nepicklujú, model si ich po načítaní vytvorí nanovo
+        return {"cache_size": self.cache_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @staticmethod
+    def split(text):
+        """
+        Tokenizácia bez cache.
+
+        Parameters
+        ----------
+        - text: vstupný text (komentár)
+
+        Returns
+        -------
+        - tokens: zoznam tokenov (slov)
+        """
+        text = text.lower()
+        if text.isascii():
+            return text.translate(_ASCII_PUNCTUATION).split()
+        return _PUNCTUATION.sub('', text).split()
+
+    def tokenize(self, text):
+        """
+        Vráti tokeny textu, z cache, ak už bol text tokenizovaný.
+
+        Parameters
+        ----------
+        - text: vstupný text (komentár)
+
+        Returns
+        -------
+        - tokens: n-tica tokenov (zdieľaná medzi volaniami, preto nemeniteľná)
+        """
+        if not self.cache_size:
+            return tuple(self.split(text))
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            tokens = self._cache.get(key)
+            if tokens is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return tokens
+            self.misses += 1
+        tokens = tuple(self.split(text))
+        with self._lock:
+            self._cache[key] = tokens
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+    __call__ = tokenize
+
+    def cache_info(self):
+        """
+        Vráti štatistiky cache.
+
+        Returns
+        -------
+        - info: slovník s počtom zásahov, výpadkov, veľkosťou cache a úspešnosťou
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cache),
+                "max_size": self.cache_size,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        """
+        Vyprázdni cache a vynuluje štatistiky.
+        """
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+# spoločný tokenizér pre všetky modely a labely v procese
+default_tokenizer = Tokenizer()
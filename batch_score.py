@@ -0,0 +1,186 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from utils.model_saver import load_best_model
+
+DEFAULT_LABELS = ["IsToxic", "IsAbusive", "IsProvocative"]
+
+# modely načítané v aktuálnom procese (hlavnom alebo v procese poolu)
+_models = {}
+
+def load_models(labels, models_dir="models"):
+    """
+    Načíta uložené najlepšie modely pre zadané labely do globálneho slovníka _models.
+    Modely v binárnom formáte sa mapujú do pamäte, takže procesy zdieľajú ich stránky.
+
+    Parameters
+    ----------
+    - labels: zoznam labelov (napr. IsToxic)
+    - models_dir: priečinok so súbormi best_model_<label>.pkl
+    """
+    for label in labels:
+        model, _ = load_best_model(f"{models_dir}/best_model_{label}.pkl")
+        if model is None:
+            raise FileNotFoundError(f"No saved model found for {label} in {models_dir}")
+        _models[label] = model
+
+def score_chunk(texts):
+    """
+    Ohodnotí blok textov všetkými načítanými modelmi.
+
+    Parameters
+    ----------
+    - texts: zoznam textov
+
+    Returns
+    -------
+    - predictions: slovník label -> zoznam predikcií (0/1)
+    """
+    return {label: [int(pred) for pred in model.predict(texts)] for label, model in _models.items()}
+
+def read_chunks(path, input_format, text_column, id_column, chunk_size):
+    """
+    Číta vstupný súbor po blokoch, v pamäti je vždy iba jeden blok.
+
+    Parameters
+    ----------
+    - path: cesta k CSV alebo JSONL súboru ("-" pre štandardný vstup)
+    - input_format: "csv" alebo "jsonl"
+    - text_column: názov stĺpca/kľúča s textom komentára
+    - id_column: názov stĺpca/kľúča s identifikátorom alebo None
+    - chunk_size: počet riadkov v bloku
+
+    Returns
+    -------
+    - generátor dvojíc (ids, texts)
+    """
+    source = sys.stdin if path == "-" else path
+    if input_format == "csv":
+        columns = [text_column] if id_column is None else [id_column, text_column]
+        for chunk in pd.read_csv(source, usecols=columns, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            ids = chunk[id_column].tolist() if id_column else None
+            yield ids, chunk[text_column].tolist()
+        return
+
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        ids, texts = [], []
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            texts.append(str(record.get(text_column) or ""))
+            if id_column:
+                ids.append(record.get(id_column))
+            if len(texts) == chunk_size:
+                yield (ids if id_column else None), texts
+                ids, texts = [], []
+        if texts:
+            yield (ids if id_column else None), texts
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+class PredictionWriter:
+    """
+    Priebežne zapisuje predikcie do CSV alebo JSONL súboru.
+    """
+    def __init__(self, path, output_format, labels, id_column):
+        """
+        Parameters
+        ----------
+        - path: cesta k výstupnému súboru ("-" pre štandardný výstup)
+        - output_format: "csv" alebo "jsonl"
+        - labels: zoznam labelov v poradí stĺpcov
+        - id_column: názov stĺpca s identifikátorom alebo None
+        """
+        self.file = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+        self.output_format = output_format
+        self.labels = labels
+        self.id_column = id_column
+        self.columns = ([id_column] if id_column else []) + labels
+        if output_format == "csv":
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(self.columns)
+
+    def write(self, ids, predictions):
+        """
+        Zapíše predikcie jedného bloku.
+
+        Parameters
+        ----------
+        - ids: zoznam identifikátorov alebo None
+        - predictions: slovník label -> zoznam predikcií
+        """
+        rows = zip(*([ids] if ids is not None else []), *(predictions[label] for label in self.labels))
+        if self.output_format == "csv":
+            self.writer.writerows(rows)
+        else:
+            for row in rows:
+                self.file.write(json.dumps(dict(zip(self.columns, row))) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+def _detect_format(path, fmt):
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".json")) else "csv"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch scoring of comments with the saved best models.")
+    parser.add_argument("input", help="Input CSV or JSONL file, '-' for stdin")
+    parser.add_argument("output", help="Output CSV or JSONL file, '-' for stdout")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], help="Defaults to the input file extension")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], help="Defaults to the output file extension")
+    parser.add_argument("--text-column", default="Text")
+    parser.add_argument("--id-column", default=None, help="Column copied to the output next to the predictions")
+    parser.add_argument("--labels", nargs="+", default=DEFAULT_LABELS)
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=1, help="Number of scoring processes")
+    args = parser.parse_args(argv)
+
+    chunks = read_chunks(args.input, _detect_format(args.input, args.input_format),
+                         args.text_column, args.id_column, args.chunk_size)
+    writer = PredictionWriter(args.output, _detect_format(args.output, args.output_format),
+                              args.labels, args.id_column)
+    n_rows = 0
+    start = time.perf_counter()
+    try:
+        if args.workers == 1:
+            load_models(args.labels, args.models_dir)
+            for ids, texts in chunks:
+                writer.write(ids, score_chunk(texts))
+                n_rows += len(texts)
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers, initializer=load_models,
+                                     initargs=(args.labels, args.models_dir)) as pool:
+                # počet rozpracovaných blokov je obmedzený, aby pamäť nerástla s veľkosťou vstupu
+                pending = deque()
+                for ids, texts in chunks:
+                    pending.append((ids, len(texts), pool.submit(score_chunk, texts)))
+                    if len(pending) >= 2 * args.workers:
+                        ids_done, size, future = pending.popleft()
+                        writer.write(ids_done, future.result())
+                        n_rows += size
+                while pending:
+                    ids_done, size, future = pending.popleft()
+                    writer.write(ids_done, future.result())
+                    n_rows += size
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    rate = n_rows / elapsed if elapsed > 0 else 0.0
+    print(f"Scored {n_rows} comments in {elapsed:.2f} s ({rate:.0f} comments/s)", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
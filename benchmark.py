@@ -0,0 +1,338 @@
+import argparse
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from algorithm.bagging import BaggingClassifier
+from algorithm.naive_bayes import SimpleNaiveBayesClassifier
+from algorithm.tokenizer import ENGLISH_STOP_WORDS, default_tokenizer
+from metrics.evaluation import evaluate_predictions
+from utils.data_loader import load_data
+from utils.model_format import load_model, save_model
+
+# veľkosti korpusov pre jednotlivé predvoľby (počet komentárov)
+PRESETS = {
+    "small": [1000, 10000],
+    "medium": [1000, 10000, 100000],
+    "large": [1000, 10000, 100000, 1000000],
+}
+
+# nastavenia orezania slovníka porovnávané v pruning_report, prvé je bez orezania
+PRUNING_CONFIGS = [
+    {},
+    {"min_df": 2},
+    {"min_df": 3},
+    {"max_vocab_size": 2000},
+    {"max_vocab_size": 500},
+    {"min_df": 2, "stop_words": ENGLISH_STOP_WORDS},
+]
+
+# n-gramové príznaky porovnávané v pruning_report (--ngram-report), prvé sú samotné slová;
+# n-gramy vyžadujú hashovanie, preto majú všetky nastavenia rovnaký n_features
+NGRAM_CONFIGS = [
+    {"n_features": 2 ** 18},
+    {"n_features": 2 ** 18, "ngram_range": (1, 2)},
+    {"n_features": 2 ** 18, "char_ngram_range": (3, 5)},
+    {"n_features": 2 ** 18, "ngram_range": (1, 2), "char_ngram_range": (3, 5)},
+]
+
+def make_corpus(n_docs, vocab_size=20000, mean_length=20, toxic_rate=0.3, seed=0):
+    """
+    Vygeneruje syntetický korpus komentárov so Zipfovým rozdelením slov.
+    Toxické komentáre navyše obsahujú slová z malej množiny "toxických" slov,
+    takže úloha je naučiteľná a presnosť modelu sa dá porovnávať medzi behmi.
+
+    Parameters
+    ----------
+    - n_docs: počet komentárov
+    - vocab_size: počet rôznych slov
+    - mean_length: priemerný počet slov v komentári
+    - toxic_rate: podiel toxických komentárov
+    - seed: seed generátora, rovnaký seed dáva rovnaký korpus; toxické slová od neho
+            nezávisia, takže korpusy s rôznym seed-om sa dajú použiť ako trénovacie a testovacie
+
+    Returns
+    -------
+    - texts: zoznam textov
+    - labels: zoznam labelov (0/1)
+    """
+    words = np.array([f"w{i}" for i in range(vocab_size)], dtype=object)
+    toxic_words = np.random.default_rng(vocab_size).choice(vocab_size, size=max(vocab_size // 100, 1), replace=False)
+    rng = np.random.default_rng(seed)
+    zipf = 1.0 / np.arange(1, vocab_size + 1)
+    zipf /= zipf.sum()
+
+    labels = (rng.random(n_docs) < toxic_rate).astype(int)
+    lengths = rng.poisson(mean_length - 1, size=n_docs) + 1
+    tokens = rng.choice(vocab_size, size=int(lengths.sum()), p=zipf)
+    # v toxických komentároch nahradíme asi desatinu slov toxickými slovami
+    doc_of_token = np.repeat(np.arange(n_docs), lengths)
+    swap = (labels[doc_of_token] == 1) & (rng.random(len(tokens)) < 0.1)
+    tokens[swap] = rng.choice(toxic_words, size=int(swap.sum()))
+
+    bounds = np.concatenate(([0], np.cumsum(lengths)))
+    doc_words = words[tokens]
+    texts = [" ".join(doc_words[bounds[i]:bounds[i + 1]]) for i in range(n_docs)]
+    return texts, labels.tolist()
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def _percentiles_ms(durations):
+    durations = np.asarray(durations) * 1000
+    return float(np.percentile(durations, 50)), float(np.percentile(durations, 99))
+
+def _peak_memory_mb(fn, *args):
+    """
+    Vráti špičku pamäte alokovanej počas volania fn (Python objekty aj numpy polia).
+    """
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+def benchmark_config(texts, labels, test_texts, test_labels, n_estimators, n_jobs=1, n_features=None,
+                     n_latency=200, measure_memory=True, random_state=0):
+    """
+    Zmeria jednu konfiguráciu BaggingClassifier na danom korpuse.
+    Pred každým meraním sa vyprázdni cache tokenizéra, aby sa merala studená cesta.
+
+    Parameters
+    ----------
+    - texts, labels: trénovacie dáta
+    - test_texts, test_labels: testovacie dáta pre priepustnosť a presnosť
+    - n_estimators: počet modelov v ensemble
+    - n_jobs: počet procesov pri trénovaní
+    - n_features: počet hashovaných stĺpcov (None znamená slovník)
+    - n_latency: počet textov, na ktorých sa meria latencia jedného textu
+    - measure_memory: ak True, trénovanie sa zopakuje pod tracemalloc kvôli špičke pamäte
+    - random_state: seed bootstrap vzoriek
+
+    Returns
+    -------
+    - result: slovník nameraných hodnôt
+    """
+    def make_model():
+        return BaggingClassifier(SimpleNaiveBayesClassifier, n_estimators=n_estimators,
+                                 n_jobs=n_jobs, random_state=random_state, n_features=n_features)
+
+    result = {}
+    default_tokenizer.clear()
+    model = make_model()
+    _, result["fit_s"] = _timed(model.fit, texts, labels)
+
+    default_tokenizer.clear()
+    predictions, elapsed = _timed(model.predict, test_texts)
+    result["predict_batch_docs_per_s"] = len(test_texts) / elapsed
+    result["accuracy"] = evaluate_predictions(test_labels, predictions)["Accuracy"]
+
+    default_tokenizer.clear()
+    _, elapsed = _timed(model.predict, test_texts, early_exit=True)
+    result["predict_early_exit_docs_per_s"] = len(test_texts) / elapsed
+
+    sample = test_texts[:n_latency]
+    default_tokenizer.clear()
+    single = [_timed(model.predict, [text])[1] for text in sample]
+    result["predict_single_p50_ms"], result["predict_single_p99_ms"] = _percentiles_ms(single)
+
+    default_tokenizer.clear()
+    explain = [_timed(model.get_contributing_words, text)[1] for text in sample]
+    result["explain_p50_ms"], result["explain_p99_ms"] = _percentiles_ms(explain)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, "model.pkl")
+        with open(pickle_path, "wb") as f:
+            pickle.dump({"model": model, "metrics": {}}, f)
+        result["pickle_size_mb"] = os.path.getsize(pickle_path) / 2 ** 20
+
+        def load_pickle():
+            with open(pickle_path, "rb") as f:
+                return pickle.load(f)
+        _, result["pickle_load_s"] = _timed(load_pickle)
+
+        model_path = os.path.join(tmp, "model.tcd")
+        save_model(model, {}, model_path)
+        result["model_size_mb"] = os.path.getsize(model_path) / 2 ** 20
+        _, result["model_load_s"] = _timed(load_model, model_path)
+
+    if measure_memory:
+        default_tokenizer.clear()
+        result["fit_peak_mb"] = _peak_memory_mb(make_model().fit, texts, labels)
+    return result
+
+def pruning_report(texts, labels, configs=PRUNING_CONFIGS, n_estimators=10, test_fraction=0.3, random_state=0):
+    """
+    Porovná nastavenia orezania slovníka (alebo n-gramových príznakov): veľkosť slovníka
+    a súboru modelu, priepustnosť predikcie a metriky z metrics.evaluation na rovnakej
+    testovacej množine. Zmeny sú uvedené oproti prvému nastaveniu (bez orezania).
+
+    Parameters
+    ----------
+    - texts, labels: dáta (napr. z load_data)
+    - configs: zoznam slovníkov s parametrami BaggingClassifier (min_df, max_vocab_size, stop_words,
+               n_features, ngram_range, char_ngram_range)
+    - n_estimators: počet modelov v ensemble
+    - test_fraction: podiel testovacích dát
+    - random_state: seed rozdelenia dát aj bootstrap vzoriek
+
+    Returns
+    -------
+    - rows: zoznam slovníkov s výsledkami pre každé nastavenie
+    """
+    order = np.random.default_rng(random_state).permutation(len(texts))
+    split = int(len(texts) * (1 - test_fraction))
+    X_train, y_train = [texts[i] for i in order[:split]], [labels[i] for i in order[:split]]
+    X_test, y_test = [texts[i] for i in order[split:]], [labels[i] for i in order[split:]]
+
+    rows = []
+    for config in configs:
+        model = BaggingClassifier(SimpleNaiveBayesClassifier, n_estimators=n_estimators,
+                                  random_state=random_state, **config)
+        model.fit(X_train, y_train)
+        default_tokenizer.clear()
+        predictions, elapsed = _timed(model.predict, X_test)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.tcd")
+            save_model(model, {}, path)
+            size_mb = os.path.getsize(path) / 2 ** 20
+        row = {"config": {name: sorted(value) if name == "stop_words" else value for name, value in config.items()},
+               "vocab_size": len(model.vocab_index), "model_size_mb": size_mb,
+               "predict_docs_per_s": len(X_test) / elapsed,
+               **evaluate_predictions(y_test, predictions)}
+        if rows:
+            base = rows[0]
+            row["size_ratio"] = size_mb / base["model_size_mb"]
+            row["throughput_ratio"] = row["predict_docs_per_s"] / base["predict_docs_per_s"]
+            row["f1_delta"] = row["F1 Score"] - base["F1 Score"]
+        rows.append(row)
+    return rows
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(sizes, vocab_sizes, lengths, estimator_counts, n_jobs=1, feature_counts=(None,), test_size=10000,
+        measure_memory=True, seed=0, log=sys.stderr):
+    """
+    Spustí benchmark pre všetky kombinácie veľkosti korpusu, slovníka, dĺžky textu,
+    počtu modelov a počtu hashovaných stĺpcov (None znamená slovník).
+
+    Returns
+    -------
+    - report: slovník s metadátami behu a zoznamom výsledkov
+    """
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+        },
+        "results": [],
+    }
+    for n_docs in sizes:
+        for vocab_size in vocab_sizes:
+            for mean_length in lengths:
+                corpus = dict(vocab_size=vocab_size, mean_length=mean_length)
+                texts, labels = make_corpus(n_docs, seed=seed, **corpus)
+                test_texts, test_labels = make_corpus(min(n_docs, test_size), seed=seed + 1, **corpus)
+                for n_estimators in estimator_counts:
+                    for n_features in feature_counts:
+                        config = {"n_docs": n_docs, "vocab_size": vocab_size, "mean_length": mean_length,
+                                  "n_estimators": n_estimators, "n_jobs": n_jobs, "n_features": n_features}
+                        print(f"benchmark {config}", file=log, flush=True)
+                        result = benchmark_config(texts, labels, test_texts, test_labels, n_estimators,
+                                                  n_jobs=n_jobs, n_features=n_features,
+                                                  measure_memory=measure_memory, random_state=seed)
+                        report["results"].append({**config, **result})
+    return report
+
+def compare(baseline, current):
+    """
+    Porovná dva reporty: pre zhodné konfigurácie vráti pomer current / baseline každej hodnoty.
+
+    Returns
+    -------
+    - rows: zoznam dvojíc (konfigurácia, slovník pomerov)
+    """
+    keys = ("n_docs", "vocab_size", "mean_length", "n_estimators", "n_jobs", "n_features")
+    base = {tuple(row.get(k) for k in keys): row for row in baseline["results"]}
+    rows = []
+    for row in current["results"]:
+        old = base.get(tuple(row.get(k) for k in keys))
+        if old is None:
+            continue
+        ratios = {name: value / old[name] for name, value in row.items()
+                  if name not in keys and old.get(name)}
+        rows.append(({k: row.get(k) for k in keys}, ratios))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark training, inference, explanation and model loading.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Corpus sizes, overrides --preset")
+    parser.add_argument("--vocab-sizes", type=int, nargs="+", default=[20000])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[20], help="Mean comment lengths in words")
+    parser.add_argument("--n-estimators", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--n-jobs", type=int, default=1)
+    parser.add_argument("--n-features", type=int, nargs="+", default=[0],
+                        help="Hashed feature space sizes to compare, 0 means the vocabulary")
+    parser.add_argument("--test-size", type=int, default=10000)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced fit for peak memory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON report path, defaults to benchmark-<commit>.json")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--pruning-report", metavar="LABEL",
+                        help="Compare vocabulary pruning settings on the dataset column LABEL instead")
+    parser.add_argument("--ngram-report", metavar="LABEL",
+                        help="Compare word and character n-gram features on the dataset column LABEL instead")
+    args = parser.parse_args(argv)
+
+    if args.pruning_report or args.ngram_report:
+        kind, label, configs = (("pruning", args.pruning_report, PRUNING_CONFIGS) if args.pruning_report
+                                else ("ngrams", args.ngram_report, NGRAM_CONFIGS))
+        texts, labels = load_data(label)
+        rows = pruning_report(texts, labels, configs, random_state=args.seed)
+        output = args.output or f"{kind}-{_git_commit() or 'local'}.json"
+        with open(output, "w") as f:
+            json.dump(rows, f, indent=2)
+        for row in rows:
+            config = {name: f"{len(value)} words" if name == "stop_words" else value
+                      for name, value in row["config"].items()}
+            print(f"{config}: vocab {row['vocab_size']}, {row['model_size_mb']:.2f} MB, "
+                  f"{row['predict_docs_per_s']:.0f} docs/s, F1 {row['F1 Score']:.3f}, Recall {row['Recall']:.3f}")
+        return
+
+    report = run(args.sizes or PRESETS[args.preset], args.vocab_sizes, args.lengths, args.n_estimators,
+                 n_jobs=args.n_jobs, feature_counts=[n or None for n in args.n_features], test_size=args.test_size,
+                 measure_memory=not args.no_memory, seed=args.seed)
+    output = args.output or f"benchmark-{report['meta']['commit'] or 'local'}.json"
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(report['results'])} results to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for config, ratios in compare(baseline, report):
+            summary = ", ".join(f"{name} x{ratio:.2f}" for name, ratio in ratios.items())
+            print(f"{config}: {summary}")
+
+if __name__ == '__main__':
+    main()
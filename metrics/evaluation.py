@@ -1,3 +1,158 @@
+import numpy as np
+
+# -----------------------------------------------------------
+# Matica zámen a metriky z nej odvodené
+# -----------------------------------------------------------
+AVERAGES = ('binary', 'macro', 'micro', 'weighted')
+
+def confusion_matrix(y_true, y_pred, classes=None):
+    """
+    Vypočíta maticu zámen jedným vektorizovaným prechodom.
+
+    Parameters
+    ----------
+    - y_true: zoznam skutočných hodnôt
+    - y_pred: zoznam predikovaných hodnôt
+    - classes: zoznam tried v poradí riadkov/stĺpcov (ak None, zoradené triedy z y_true aj y_pred)
+
+    Returns
+    -------
+    - matrix: pole (triedy x triedy), riadok = skutočná trieda, stĺpec = predikovaná trieda
+    - classes: zoznam tried
+    """
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    if classes is None:
+        classes, codes = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+        true_codes, pred_codes = codes[:len(y_true)], codes[len(y_true):]
+        classes = classes.tolist()
+    else:
+        lookup = {cls: idx for idx, cls in enumerate(classes)}
+        true_codes = np.fromiter((lookup[v] for v in y_true.tolist()), dtype=np.int64, count=len(y_true))
+        pred_codes = np.fromiter((lookup[v] for v in y_pred.tolist()), dtype=np.int64, count=len(y_pred))
+    n_classes = len(classes)
+    matrix = np.bincount(true_codes * n_classes + pred_codes, minlength=n_classes * n_classes)
+    return matrix.reshape(n_classes, n_classes), list(classes)
+
+def multilabel_confusion_matrix(Y_true, Y_pred):
+    """
+    Vypočíta matice zámen pre všetky binárne labely naraz.
+
+    Parameters
+    ----------
+    - Y_true: skutočné vektory labelov (dokumenty x labely)
+    - Y_pred: predikované vektory labelov (dokumenty x labely)
+
+    Returns
+    -------
+    - matrices: pole (labely x 2 x 2), triedy v poradí [0, 1]
+    """
+    Y_true = np.asarray(Y_true, dtype=bool)
+    Y_pred = np.asarray(Y_pred, dtype=bool)
+    tp = np.count_nonzero(Y_true & Y_pred, axis=0)
+    fn = np.count_nonzero(Y_true & ~Y_pred, axis=0)
+    fp = np.count_nonzero(~Y_true & Y_pred, axis=0)
+    tn = len(Y_true) - tp - fn - fp
+    return np.stack([np.stack([tn, fp], axis=-1), np.stack([fn, tp], axis=-1)], axis=-2)
+
+def _divide(numerator, denominator):
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    return np.divide(numerator, denominator, out=np.zeros(np.broadcast(numerator, denominator).shape),
+                     where=denominator > 0)
+
+def _f1(precision, recall):
+    return _divide(2 * precision * recall, precision + recall)
+
+def metrics_from_confusion(matrix, average='weighted', positive_index=None):
+    """
+    Odvodí accuracy, precision, recall a F1 z matice zámen (ako v sklearn).
+    Funguje aj pre viac matíc naraz, tvaru (..., triedy, triedy).
+
+    Parameters
+    ----------
+    - matrix: matica zámen, riadok = skutočná trieda, stĺpec = predikovaná trieda
+    - average: 'binary', 'macro', 'micro' alebo 'weighted'
+    - positive_index: index pozitívnej triedy pre average='binary' (None, ak trieda v dátach nie je)
+
+    Returns
+    -------
+    - metrics: slovník s kľúčmi "Accuracy", "Precision", "Recall", "F1 Score"
+    """
+    if average not in AVERAGES:
+        raise ValueError(f"Supported averaging types are {', '.join(repr(a) for a in AVERAGES)}")
+    matrix = np.asarray(matrix, dtype=np.float64)
+    tp = np.diagonal(matrix, axis1=-2, axis2=-1)
+    predicted = matrix.sum(axis=-2)
+    support = matrix.sum(axis=-1)
+    total = support.sum(axis=-1)
+    accuracy = _divide(tp.sum(axis=-1), total)
+
+    if average == 'micro':
+        # pri jednom labeli na dokument sa micro precision, recall aj F1 rovnajú accuracy
+        precision = recall = f1 = accuracy
+    elif average == 'binary':
+        if positive_index is None:
+            precision = recall = f1 = np.zeros_like(accuracy)
+        else:
+            precision = _divide(tp[..., positive_index], predicted[..., positive_index])
+            recall = _divide(tp[..., positive_index], support[..., positive_index])
+            f1 = _f1(precision, recall)
+    else:
+        class_precision = _divide(tp, predicted)
+        class_recall = _divide(tp, support)
+        class_f1 = _f1(class_precision, class_recall)
+        if average == 'weighted':
+            weights = _divide(support, total[..., None])
+        else:
+            weights = np.ones_like(support) / support.shape[-1]
+        precision = (class_precision * weights).sum(axis=-1)
+        recall = (class_recall * weights).sum(axis=-1)
+        f1 = (class_f1 * weights).sum(axis=-1)
+
+    def _value(array):
+        return float(array) if np.ndim(array) == 0 else array
+    return {"Accuracy": _value(accuracy), "Precision": _value(precision),
+            "Recall": _value(recall), "F1 Score": _value(f1)}
+
+def evaluate_predictions(y_true, y_pred, positive=1, average='weighted'):
+    """
+    Vypočíta všetky metriky z jednej matice zámen.
+
+    Parameters
+    ----------
+    - y_true: zoznam skutočných hodnôt
+    - y_pred: zoznam predikovaných hodnôt
+    - positive: hodnota pozitívnej triedy, použité len pre average='binary'
+    - average: 'binary', 'macro', 'micro' alebo 'weighted'
+
+    Returns
+    -------
+    - metrics: slovník s kľúčmi "Accuracy", "Precision", "Recall", "F1 Score"
+    """
+    matrix, classes = confusion_matrix(y_true, y_pred)
+    positive_index = classes.index(positive) if positive in classes else None
+    return metrics_from_confusion(matrix, average, positive_index)
+
+def evaluate_multilabel(Y_true, Y_pred, labels, average='weighted'):
+    """
+    Vypočíta metriky pre všetky binárne labely naraz.
+
+    Parameters
+    ----------
+    - Y_true: skutočné vektory labelov (dokumenty x labely)
+    - Y_pred: predikované vektory labelov (dokumenty x labely)
+    - labels: názvy labelov v poradí stĺpcov
+    - average: 'binary' (pozitívna trieda 1), 'macro', 'micro' alebo 'weighted'
+
+    Returns
+    -------
+    - metrics: slovník label -> slovník metrík
+    """
+    matrices = multilabel_confusion_matrix(Y_true, Y_pred)
+    scores = metrics_from_confusion(matrices, average, positive_index=1)
+    return {label: {name: float(values[i]) for name, values in scores.items()} for i, label in enumerate(labels)}
+
 # -----------------------------------------------------------
 # Implementácia metrík ako samostatných funkcií
 # -----------------------------------------------------------
@@ -14,8 +169,7 @@ def accuracy_metric(y_true, y_pred):
     -------
     - presnosť modelu
     """
-    correct = sum(1 for true, pred in zip(y_true, y_pred) if true == pred)
-    return correct / len(y_true)
+    return evaluate_predictions(y_true, y_pred)["Accuracy"]
 
 def precision_metric(y_true, y_pred, positive=1, average='weighted'):
     """
@@ -26,30 +180,13 @@ def precision_metric(y_true, y_pred, positive=1, average='weighted'):
     - y_true: zoznam skutočných hodnôt
     - y_pred: zoznam predikovaných hodnôt
     - positive: hodnota pozitívnej triedy (štandardne 1), použité len pre average='binary'
-    - average: typ priemerovania ('binary' alebo 'weighted', štandardne 'weighted')
+    - average: typ priemerovania ('binary', 'macro', 'micro' alebo 'weighted', štandardne 'weighted')
     
     Returns
     -------
-    - precision (buď pre pozitívnu triedu alebo vážený priemer)
-    """
-    if average == 'binary':
-        tp = sum(1 for true, pred in zip(y_true, y_pred) if true == positive and pred == positive)
-        fp = sum(1 for true, pred in zip(y_true, y_pred) if true != positive and pred == positive)
-        return tp / (tp + fp) if (tp + fp) > 0 else 0
-    elif average == 'weighted':
-        classes = sorted(set(y_true))
-        precisions = []
-        class_counts = []
-        for cls in classes:
-            tp = sum(1 for true, pred in zip(y_true, y_pred) if true == cls and pred == cls)
-            fp = sum(1 for true, pred in zip(y_true, y_pred) if true != cls and pred == cls)
-            precision = tp / (tp + fp) if (tp + fp) > 0 else 0
-            precisions.append(precision)
-            class_counts.append(sum(1 for true in y_true if true == cls))
-        total = sum(class_counts)
-        return sum(p * count / total for p, count in zip(precisions, class_counts))
-    else:
-        raise ValueError("Supported averaging types are 'binary' or 'weighted'")
+    - precision (buď pre pozitívnu triedu alebo priemer)
+    """
+    return evaluate_predictions(y_true, y_pred, positive, average)["Precision"]
 
 def recall_metric(y_true, y_pred, positive=1, average='weighted'):
     """
@@ -60,30 +197,13 @@ def recall_metric(y_true, y_pred, positive=1, average='weighted'):
     - y_true: zoznam skutočných hodnôt
     - y_pred: zoznam predikovaných hodnôt
     - positive: hodnota pozitívnej triedy (štandardne 1), použité len pre average='binary'
-    - average: typ priemerovania ('binary' alebo 'weighted', štandardne 'weighted')
+    - average: typ priemerovania ('binary', 'macro', 'micro' alebo 'weighted', štandardne 'weighted')
     
     Returns
     -------
-    - recall (buď pre pozitívnu triedu alebo vážený priemer)
-    """
-    if average == 'binary':
-        tp = sum(1 for true, pred in zip(y_true, y_pred) if true == positive and pred == positive)
-        fn = sum(1 for true, pred in zip(y_true, y_pred) if true == positive and pred != positive)
-        return tp / (tp + fn) if (tp + fn) > 0 else 0
-    elif average == 'weighted':
-        classes = sorted(set(y_true))
-        recalls = []
-        class_counts = []
-        for cls in classes:
-            tp = sum(1 for true, pred in zip(y_true, y_pred) if true == cls and pred == cls)
-            fn = sum(1 for true, pred in zip(y_true, y_pred) if true == cls and pred != cls)
-            recall = tp / (tp + fn) if (tp + fn) > 0 else 0
-            recalls.append(recall)
-            class_counts.append(sum(1 for true in y_true if true == cls))
-        total = sum(class_counts)
-        return sum(r * count / total for r, count in zip(recalls, class_counts))
-    else:
-        raise ValueError("Supported averaging types are 'binary' or 'weighted'")
+    - recall (buď pre pozitívnu triedu alebo priemer)
+    """
+    return evaluate_predictions(y_true, y_pred, positive, average)["Recall"]
 
 def f1_metric(y_true, y_pred, positive=1, average='weighted'):
     """
@@ -94,27 +214,10 @@ def f1_metric(y_true, y_pred, positive=1, average='weighted'):
     - y_true: zoznam skutočných hodnôt
     - y_pred: zoznam predikovaných hodnôt
     - positive: hodnota pozitívnej triedy (štandardne 1), použité len pre average='binary'
-    - average: typ priemerovania ('binary' alebo 'weighted', štandardne 'weighted')
+    - average: typ priemerovania ('binary', 'macro', 'micro' alebo 'weighted', štandardne 'weighted')
     
     Returns
     -------
-    - F1 miera (buď pre pozitívnu triedu alebo vážený priemer)
-    """
-    if average == 'binary':
-        prec = precision_metric(y_true, y_pred, positive=positive, average='binary')
-        rec = recall_metric(y_true, y_pred, positive=positive, average='binary')
-        return 2 * (prec * rec) / (prec + rec) if (prec + rec) > 0 else 0
-    elif average == 'weighted':
-        classes = sorted(set(y_true))
-        f1_scores = []
-        class_counts = []
-        for cls in classes:
-            prec = precision_metric(y_true, y_pred, positive=cls, average='binary')
-            rec = recall_metric(y_true, y_pred, positive=cls, average='binary')
-            f1 = 2 * (prec * rec) / (prec + rec) if (prec + rec) > 0 else 0
-            f1_scores.append(f1)
-            class_counts.append(sum(1 for true in y_true if true == cls))
-        total = sum(class_counts)
-        return sum(f1 * count / total for f1, count in zip(f1_scores, class_counts))
-    else:
-        raise ValueError("Supported averaging types are 'binary' or 'weighted'")
\ No newline at end of file
+    - F1 miera (buď pre pozitívnu triedu alebo priemer)
+    """
+    return evaluate_predictions(y_true, y_pred, positive, average)["F1 Score"]
\ No newline at end of file
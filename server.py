@@ -0,0 +1,187 @@
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from algorithm.tokenizer import default_tokenizer
+from utils.batching import MicroBatcher
+from utils.instrumentation import PrometheusExporter, instrumentation
+from utils.model_registry import ModelRegistry
+from utils.model_saver import load_best_model
+from utils.result_cache import ResultCache, cached_predict_fn
+
+DEFAULT_LABELS = ["IsToxic", "IsAbusive", "IsProvocative"]
+
+def make_predict_fn(models):
+    """
+    Vytvorí funkciu, ktorá dávku textov vyhodnotí všetkými modelmi naraz.
+
+    Parameters
+    ----------
+    - models: slovník label -> model
+
+    Returns
+    -------
+    - predict_fn: funkcia zoznam textov -> zoznam slovníkov label -> 0/1
+    """
+    def predict_fn(texts):
+        predictions = {label: model.predict(texts) for label, model in models.items()}
+        return [{label: int(predictions[label][i]) for label in models} for i in range(len(texts))]
+    return predict_fn
+
+def make_reloading_predict_fn(registry, labels, build_predict_fn):
+    """
+    Vytvorí funkciu predikcie nad aktuálnymi verziami modelov v registri. Pred každou dávkou
+    sa overí ukazovateľ registra (lacné os.stat najviac raz za registry.check_interval);
+    po zmene sa nová verzia načíta a funkcia predikcie sa postaví znova, bez reštartu servera.
+
+    Parameters
+    ----------
+    - registry: ModelRegistry
+    - labels: zoznam labelov
+    - build_predict_fn: funkcia slovník label -> model -> funkcia predikcie
+
+    Returns
+    -------
+    - predict_fn: funkcia zoznam textov -> zoznam výsledkov
+    """
+    state = {"models": None, "predict_fn": None}
+
+    def predict_fn(texts):
+        models = {label: registry.current(label)[0] for label in labels}
+        if state["models"] is None or any(models[label] is not state["models"][label] for label in labels):
+            state["predict_fn"] = build_predict_fn(models)
+            state["models"] = models
+        return state["predict_fn"](texts)
+    return predict_fn
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    """
+    HTTP rozhranie:
+    - POST /predict s {"text": "..."} alebo {"texts": ["...", ...]}
+    - GET /metrics so štatistikami latencie, frontu, cache tokenizéra, cache výsledkov a verziami modelov
+    - GET /metrics/prometheus s meraniami úsekov predikcie (iba so zapnutým --instrument)
+    - GET /health
+    """
+    batcher = None  # nastavené v main()
+    exporter = None  # PrometheusExporter, ak je meranie zapnuté
+    result_cache = None  # ResultCache, ak je zapnutá
+    registry = None  # ModelRegistry, ak sa modely načítavajú z registra
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            stats = {**self.batcher.stats(), "tokenizer_cache": default_tokenizer.cache_info()}
+            if self.result_cache is not None:
+                stats["result_cache"] = self.result_cache.cache_info()
+            if self.registry is not None:
+                stats["model_versions"] = self.registry.loaded_versions()
+            if self.exporter is not None:
+                stats["instrumentation"] = self.exporter.snapshot()
+            self._send_json(200, stats)
+        elif self.path == "/metrics/prometheus" and self.exporter is not None:
+            body = self.exporter.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            single = "text" in payload
+            texts = [payload["text"]] if single else payload["texts"]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": "Expected JSON body {\"text\": str} or {\"texts\": [str, ...]}"})
+            return
+        try:
+            predictions = self.batcher.predict(texts)
+        except Exception as exc:
+            # chyba modelu alebo načítania novej verzie nesmie zhodiť spojenie bez odpovede
+            self._send_json(500, {"error": f"Prediction failed: {type(exc).__name__}: {exc}"})
+            return
+        self._send_json(200, {"prediction": predictions[0]} if single else {"predictions": predictions})
+
+    def log_message(self, format, *args):
+        # logovanie každej požiadavky by pri vysokom QPS zbytočne spomaľovalo
+        pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP inference server for the saved best models.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--labels", nargs="+", default=DEFAULT_LABELS)
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--instrument", action="store_true", help="Time tokenization, scoring, voting and loading")
+    parser.add_argument("--result-cache", type=int, default=0, metavar="N",
+                        help="Cache results of up to N distinct normalized comments (0 disables)")
+    parser.add_argument("--result-cache-ttl", type=float, help="Result cache entry lifetime in seconds")
+    parser.add_argument("--result-cache-path", help="SQLite file to share the result cache between processes")
+    parser.add_argument("--compact", action="store_true",
+                        help="Serve compact_model_<label>.pkl (see utils/compaction.py) where it exists")
+    parser.add_argument("--reload-interval", type=float, default=1.0,
+                        help="Seconds between checks of the model registry for a new current version")
+    args = parser.parse_args(argv)
+
+    if args.instrument:
+        InferenceHandler.exporter = PrometheusExporter()
+        instrumentation.enable(InferenceHandler.exporter)
+
+    if args.result_cache:
+        InferenceHandler.result_cache = ResultCache(args.result_cache, args.result_cache_ttl, args.result_cache_path)
+
+    def build_predict_fn(models):
+        predict_fn = make_predict_fn(models)
+        if InferenceHandler.result_cache is not None:
+            predict_fn = cached_predict_fn(predict_fn, models, InferenceHandler.result_cache)
+        return predict_fn
+
+    if args.compact:
+        # zlúčené modely sa načítajú iba raz pri štarte; nie sú v registri, nový súbor
+        # compact_model_<label>.pkl sa prejaví až po reštarte (cache výsledkov kľúčuje ich odtlačkom)
+        models = {}
+        for label in args.labels:
+            model, _ = load_best_model(f"{args.models_dir}/compact_model_{label}.pkl")
+            if model is None:
+                model, _ = load_best_model(f"{args.models_dir}/best_model_{label}.pkl")
+            if model is None:
+                raise FileNotFoundError(f"No saved model found for {label} in {args.models_dir}")
+            models[label] = model
+        predict_fn = build_predict_fn(models)
+    else:
+        # aktuálne verzie z registra, nová verzia sa načíta bez reštartu
+        InferenceHandler.registry = ModelRegistry(args.models_dir, args.reload_interval)
+        for label in args.labels:
+            InferenceHandler.registry.current(label)
+        predict_fn = make_reloading_predict_fn(InferenceHandler.registry, args.labels, build_predict_fn)
+    InferenceHandler.batcher = MicroBatcher(predict_fn, args.max_batch_size, args.max_wait_ms)
+    server = ThreadingHTTPServer((args.host, args.port), InferenceHandler)
+    print(f"Serving {', '.join(args.labels)} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        InferenceHandler.batcher.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+import asyncio
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from utils.model_saver import load_best_model
+
+DEFAULT_LABELS = ["IsToxic", "IsAbusive", "IsProvocative"]
+
+# modely načítané v procese poolu (_init_worker); vláknový pool používa modely inštancie
+_worker_models = {}
+
+def _load_models(labels, models_dir):
+    """
+    Načíta uložené najlepšie modely pre labely.
+
+    Returns
+    -------
+    - models: slovník label -> model
+    """
+    models = {}
+    for label in labels:
+        model, _ = load_best_model(f"{models_dir}/best_model_{label}.pkl")
+        if model is None:
+            raise FileNotFoundError(f"No saved model found for {label} in {models_dir}")
+        # staršie modely sa kompilujú pri prvej predikcii, vo vláknovom poole to musí prebehnúť vopred
+        model.predict([])
+        models[label] = model
+    return models
+
+def _init_worker(labels, models_dir):
+    """
+    Inicializácia procesu poolu: modely sa načítajú raz na proces.
+    """
+    global _worker_models
+    _worker_models = _load_models(labels, models_dir)
+
+def _score(texts, models=None):
+    """
+    Ohodnotí dávku textov všetkými modelmi.
+
+    Parameters
+    ----------
+    - texts: zoznam textov
+    - models: slovník label -> model, ak None, modely načítané v procese poolu
+
+    Returns
+    -------
+    - results: zoznam slovníkov label -> 0/1 (jeden na text)
+    """
+    models = _worker_models if models is None else models
+    predictions = {label: model.predict(texts) for label, model in models.items()}
+    return [{label: int(predictions[label][i]) for label in models} for i in range(len(texts))]
+
+class _Request:
+    __slots__ = ("texts", "future")
+
+    def __init__(self, texts, future):
+        self.texts = texts
+        self.future = future
+
+class AsyncClassifier:
+    """
+    Asynchrónne rozhranie nad modelmi labelov pre aplikácie postavené na asyncio.
+    Volania classify sa nezablokujú: súbežné malé požiadavky sa zlúčia do dávok
+    a dávky sa vyhodnotia v ohraničenom poole procesov (alebo vlákien), takže
+    priepustnosť rastie s počtom jadier a event loop ostáva voľný.
+
+    - Spätný tlak: front čakajúcich požiadaviek má najviac max_pending položiek,
+      pri plnom fronte classify čaká, kým sa neuvoľní miesto. Naraz sa vyhodnocuje
+      najviac 2 x max_workers dávok.
+    - Zrušenie: zrušená požiadavka sa do dávky nezaradí; ak už dávka beží, jej výsledok sa zahodí.
+    """
+    def __init__(self, labels=DEFAULT_LABELS, models_dir="models", max_workers=None, max_batch_size=256,
+                 max_wait_ms=2.0, max_pending=1024, executor="process"):
+        """
+        Parameters
+        ----------
+        - labels: zoznam labelov, pre ktoré sa načítajú modely
+        - models_dir: priečinok so súbormi best_model_<label>.pkl
+        - max_workers: počet procesov/vlákien, ak None, počet jadier
+        - max_batch_size: najväčší počet textov v jednej dávke
+        - max_wait_ms: najdlhšie čakanie na ďalšie požiadavky po prijatí prvej
+        - max_pending: najväčší počet čakajúcich požiadaviek
+        - executor: "process" (modely sa v každom procese namapujú zo súboru) alebo "thread"
+        """
+        if executor not in ("process", "thread"):
+            raise ValueError("executor must be 'process' or 'thread'")
+        self.labels = list(labels)
+        self.models_dir = models_dir
+        self.max_workers = max_workers or os.cpu_count()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_pending = max_pending
+        self.executor_type = executor
+        self._executor = None
+        self._models = None  # modely pre vláknový pool
+        self._loop = None
+        self._queue = None
+        self._slots = None
+        self._collector = None
+        self._running = set()
+        self.n_requests = 0
+        self.n_batches = 0
+        self.n_texts = 0
+
+    async def __aenter__(self):
+        self._start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _start(self):
+        if self._collector is not None:
+            return
+        if self.executor_type == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                                 initargs=(self.labels, self.models_dir))
+        else:
+            self._models = _load_models(self.labels, self.models_dir)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._slots = asyncio.Semaphore(2 * self.max_workers)
+        self._collector = self._loop.create_task(self._collect())
+
+    async def classify(self, texts):
+        """
+        Vráti predikcie všetkých labelov pre texty.
+
+        Parameters
+        ----------
+        - texts: zoznam textov
+
+        Returns
+        -------
+        - results: zoznam slovníkov label -> 0/1 (jeden na text)
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        self._start()
+        request = _Request(texts, asyncio.get_running_loop().create_future())
+        await self._queue.put(request)
+        return await request.future
+
+    async def _collect(self):
+        """
+        Zbiera požiadavky z frontu do dávok a posiela ich na vyhodnotenie.
+        """
+        loop = asyncio.get_running_loop()
+        stop = False
+        while not stop:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            size = len(first.texts)
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                size += len(request.texts)
+            batch = [request for request in batch if not request.future.cancelled()]
+            if not batch:
+                continue
+            await self._slots.acquire()
+            task = loop.create_task(self._dispatch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _dispatch(self, batch):
+        texts = [text for request in batch for text in request.texts]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self._executor, _score, texts, self._models)
+        except Exception as exc:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(exc)
+            return
+        finally:
+            self._slots.release()
+        self.n_batches += 1
+        self.n_requests += len(batch)
+        self.n_texts += len(texts)
+        start = 0
+        for request in batch:
+            end = start + len(request.texts)
+            if not request.future.done():
+                request.future.set_result(results[start:end])
+            start = end
+
+    def stats(self):
+        """
+        Vráti počty požiadaviek, dávok a textov, priemernú veľkosť dávky a hĺbku frontu.
+        """
+        return {
+            "requests": self.n_requests,
+            "batches": self.n_batches,
+            "texts": self.n_texts,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "mean_batch_size": self.n_texts / self.n_batches if self.n_batches else 0.0,
+        }
+
+    async def close(self):
+        """
+        Dokončí požiadavky, ktoré už sú vo fronte, a ukončí pool.
+        """
+        if self._collector is None:
+            return
+        await self._queue.put(None)
+        await self._collector
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self._collector = None
+
+# spoločná inštancia pre funkciu classify, vytvorí sa pri prvom volaní v event loope
+_default_classifier = None
+
+async def classify(texts):
+    """
+    Vráti predikcie modelov IsToxic, IsAbusive a IsProvocative pre texty
+    cez spoločný AsyncClassifier s predvolenými nastaveniami. Pool procesov
+    ostáva bežať medzi volaniami; ukončí ho close() (alebo koniec programu).
+
+    Parameters
+    ----------
+    - texts: zoznam textov
+
+    Returns
+    -------
+    - results: zoznam slovníkov label -> 0/1 (jeden na text)
+    """
+    global _default_classifier
+    if _default_classifier is not None and _default_classifier._loop is not asyncio.get_running_loop():
+        # inštancia z iného (napr. už skončeného) event loopu sa nedá použiť
+        _shutdown_default()
+    if _default_classifier is None:
+        _default_classifier = AsyncClassifier()
+    return await _default_classifier.classify(texts)
+
+async def close():
+    """
+    Dokončí rozpracované požiadavky spoločnej inštancie funkcie classify a ukončí jej pool.
+    """
+    global _default_classifier
+    if _default_classifier is not None:
+        classifier, _default_classifier = _default_classifier, None
+        await classifier.close()
+
+def _shutdown_default():
+    # bez event loopu sa dá iba ukončiť pool, čakajúce požiadavky sa zrušia
+    global _default_classifier
+    if _default_classifier is not None and _default_classifier._executor is not None:
+        _default_classifier._executor.shutdown(wait=False, cancel_futures=True)
+    _default_classifier = None
+
+atexit.register(_shutdown_default)
@@ -0,0 +1,146 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+class _Request:
+    __slots__ = ("texts", "future", "submitted")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.future = Future()
+        self.submitted = time.perf_counter()
+
+class MicroBatcher:
+    """
+    Zlučuje súbežné požiadavky na predikciu do väčších dávok.
+    Samostatné vlákno čaká na prvú požiadavku a potom ešte najviac max_wait_ms
+    zbiera ďalšie, kým dávka nedosiahne max_batch_size textov. Celá dávka sa
+    vyhodnotí jedným volaním predict_fn a výsledky sa rozdelia späť požiadavkám.
+    """
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=5.0, latency_window=10000):
+        """
+        Parameters
+        ----------
+        - predict_fn: funkcia, ktorá pre zoznam textov vráti zoznam výsledkov (jeden na text)
+        - max_batch_size: najväčší počet textov v jednej dávke
+        - max_wait_ms: najdlhšie čakanie na ďalšie požiadavky po prijatí prvej
+        - latency_window: počet posledných požiadaviek, z ktorých sa počítajú percentily latencie
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._latencies = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+        self.n_requests = 0
+        self.n_batches = 0
+        self.n_texts = 0
+        self.n_failed_batches = 0   # dávky, pri ktorých predict_fn vyhodila výnimku
+        self.n_failed_requests = 0
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        """
+        Zaradí texty na predikciu.
+
+        Parameters
+        ----------
+        - texts: zoznam textov
+
+        Returns
+        -------
+        - future: concurrent.futures.Future so zoznamom výsledkov pre texty
+        """
+        request = _Request(list(texts))
+        self._queue.put(request)
+        return request.future
+
+    def predict(self, texts, timeout=None):
+        """
+        Synchrónne vráti výsledky pre texty, predikcia prebehne v spoločnej dávke.
+        """
+        return self.submit(texts).result(timeout)
+
+    def close(self):
+        """
+        Ukončí vlákno po spracovaní požiadaviek, ktoré už sú vo fronte.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        """
+        Zozbiera dávku začínajúcu požiadavkou first. Vráti dávku a príznak ukončenia.
+        """
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+            size += len(request.texts)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+            texts = [text for request in batch for text in request.texts]
+            try:
+                results = self.predict_fn(texts)
+            except Exception as exc:
+                with self._lock:
+                    self.n_failed_batches += 1
+                    self.n_failed_requests += len(batch)
+                for request in batch:
+                    request.future.set_exception(exc)
+                continue
+            finished = time.perf_counter()
+            start = 0
+            with self._lock:
+                self.n_batches += 1
+                self.n_requests += len(batch)
+                self.n_texts += len(texts)
+                for request in batch:
+                    self._latencies.append(finished - request.submitted)
+            for request in batch:
+                end = start + len(request.texts)
+                request.future.set_result(results[start:end])
+                start = end
+
+    def stats(self):
+        """
+        Vráti štatistiky: počty požiadaviek a dávok (aj neúspešných), hĺbku frontu a percentily latencie v ms.
+
+        Returns
+        -------
+        - stats: slovník štatistík
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "requests": self.n_requests,
+                "batches": self.n_batches,
+                "texts": self.n_texts,
+                "queue_depth": self._queue.qsize(),
+                "mean_batch_size": self.n_texts / self.n_batches if self.n_batches else 0.0,
+                "failed_batches": self.n_failed_batches,
+                "failed_requests": self.n_failed_requests,
+            }
+        for name, q in (("p50_ms", 0.50), ("p99_ms", 0.99)):
+            stats[name] = latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000 if latencies else 0.0
+        return stats
@@ -0,0 +1,152 @@
+import argparse
+import json
+import time
+from metrics.evaluation import evaluate_predictions
+from utils.data_loader import TEXT_COLUMN, load_columns, load_data
+from utils.model_format import save_model
+from utils.model_registry import ModelRegistry, data_fingerprint, load_model_file
+from utils.model_trainer import split_rows
+
+# -----------------------------------------------------------
+# Zlúčenie ensemble do jedného modelu pre nasadenie
+# -----------------------------------------------------------
+# Zlúčený model (BaggingClassifier.distill) sa uloží vedľa najlepšieho modelu ako
+# compact_model_<label>.pkl iba vtedy, ak sa na odloženej časti dát zhoduje
+# s celým ensemble aspoň v podiele threshold predikcií. Odložená časť sú komentáre,
+# ktoré ensemble pri trénovaní nevidel: evaluačná časť rozdelenia podľa split_seed
+# z metadát aktuálnej verzie v registri, alebo samostatný súbor (eval_data).
+DEFAULT_THRESHOLD = 0.98
+
+def agreement_report(model, compact_model, texts, labels=None):
+    """
+    Porovná predikcie zlúčeného modelu s celým ensemble.
+
+    Parameters
+    ----------
+    - model: pôvodný BaggingClassifier
+    - compact_model: zlúčený model (napr. z model.distill())
+    - texts: odložené texty
+    - labels: ich skutočné triedy, ak sú známe
+
+    Returns
+    -------
+    - report: slovník s kľúčmi
+        - "agreement": podiel textov, pre ktoré oba modely predikujú rovnakú triedu
+        - "agreement_metrics": metriky z evaluate_predictions, predikcie ensemble sú v úlohe skutočných tried
+        - "speedup": koľkokrát rýchlejšia je predikcia zlúčeného modelu
+        - "ensemble", "compact": metriky oboch modelov voči labels (iba ak sú zadané)
+    """
+    start = time.perf_counter()
+    ensemble_predictions = model.predict(texts)
+    ensemble_time = time.perf_counter() - start
+    start = time.perf_counter()
+    compact_predictions = compact_model.predict(texts)
+    compact_time = time.perf_counter() - start
+
+    agreement_metrics = evaluate_predictions(ensemble_predictions, compact_predictions)
+    report = {
+        "agreement": agreement_metrics["Accuracy"],
+        "agreement_metrics": agreement_metrics,
+        "speedup": ensemble_time / compact_time if compact_time else float("inf"),
+    }
+    if labels is not None:
+        report["ensemble"] = evaluate_predictions(labels, ensemble_predictions)
+        report["compact"] = evaluate_predictions(labels, compact_predictions)
+    return report
+
+def held_out_data(label, metadata, eval_data=None):
+    """
+    Vráti komentáre, ktoré uložený model pri trénovaní nevidel.
+
+    Parameters
+    ----------
+    - label: názov stĺpca s labelmi (napr. "IsToxic")
+    - metadata: metadáta aktuálnej verzie z registra alebo None (model mimo registra)
+    - eval_data: cesta k CSV súboru s odloženými komentármi, ak None, použije sa evaluačná
+                 časť rozdelenia (split_rows) podľa split_seed z metadát
+
+    Returns
+    -------
+    - texts: odložené texty
+    - labels: ich triedy
+    """
+    if eval_data is not None:
+        columns = load_columns(eval_data)
+        return list(columns[TEXT_COLUMN]), columns[label].tolist()
+    params = (metadata or {}).get("params", {})
+    if "split_seed" not in params:
+        raise ValueError(f"The saved model of {label} does not record its training split "
+                         "(trained outside get_trained_model, updated or cross-validated on all data); "
+                         "pass eval_data with held-out comments")
+    texts, labels = load_data(label)
+    if data_fingerprint(texts, labels) != metadata.get("data_hash"):
+        raise ValueError(f"The dataset changed since the saved model of {label} was trained; "
+                         "pass eval_data with held-out comments")
+    _, _, eval_rows = split_rows(len(texts), params["split_seed"])
+    return [texts[i] for i in eval_rows], [labels[i] for i in eval_rows]
+
+def compact_saved_model(label, method="counts", threshold=DEFAULT_THRESHOLD, models_dir="models", eval_data=None):
+    """
+    Zlúči uložený najlepší model pre label do jedného Naive Bayes modelu a uloží ho
+    ako compact_model_<label>.pkl, ak je zhoda s ensemble aspoň threshold.
+    Porovnáva sa iba na komentároch, ktoré ensemble pri trénovaní nevidel (held_out_data),
+    a metriky z nich sa uložia so zlúčeným modelom.
+
+    Parameters
+    ----------
+    - label: názov stĺpca s labelmi (napr. "IsToxic")
+    - method: "counts" alebo "log_probs", ako v BaggingClassifier.distill
+    - threshold: najmenšia zhoda s ensemble, pri ktorej sa zlúčený model uloží
+    - models_dir: priečinok s modelmi
+    - eval_data: cesta k CSV súboru s odloženými komentármi (ako v held_out_data)
+
+    Returns
+    -------
+    - compact_model: zlúčený model
+    - report: výsledok agreement_report doplnený o "method", "threshold", "accepted" a "n_eval"
+    """
+    registry = ModelRegistry(models_dir)
+    if registry.current_version(label) is not None:
+        model, metadata = registry.load(label)
+    else:
+        try:
+            model, _ = load_model_file(registry.published_filename(label))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No saved model found for {label} in {models_dir}") from None
+        metadata = None
+    texts, labels = held_out_data(label, metadata, eval_data)
+    compact_model = model.distill(method)
+
+    report = agreement_report(model, compact_model, texts, labels)
+    report.update(method=method, threshold=threshold, accepted=report["agreement"] >= threshold,
+                  n_eval=len(texts))
+    if report["accepted"]:
+        save_model(compact_model, {**report["compact"], "Agreement": report["agreement"]},
+                   f"{models_dir}/compact_model_{label}.pkl")
+    return compact_model, report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collapse a saved bagging ensemble into a single Naive Bayes model.")
+    parser.add_argument("labels", nargs="+", help="Label columns, e.g. IsToxic")
+    parser.add_argument("--method", choices=["counts", "log_probs"], default="counts")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum agreement with the ensemble required to save the compact model")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--eval-data", help="CSV file with held-out comments the saved models never saw; "
+                                            "defaults to the evaluation split recorded in the model registry")
+    parser.add_argument("--output", help="Write the reports as JSON")
+    args = parser.parse_args(argv)
+
+    reports = {}
+    for label in args.labels:
+        _, report = compact_saved_model(label, args.method, args.threshold, args.models_dir, args.eval_data)
+        reports[label] = report
+        status = "saved" if report["accepted"] else "not saved"
+        print(f"{label}: agreement {report['agreement']:.4f}, {report['speedup']:.1f}x faster, "
+              f"F1 {report['ensemble']['F1 Score']:.4f} -> {report['compact']['F1 Score']:.4f} ({status})")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,118 @@
+import hashlib
+import os
+import threading
+import numpy as np
 import pandas as pd
 
+DATA_FILE = "data/youtoxic_english_1000.csv"
+CACHE_DIRNAME = ".cache"  # stĺpcová cache sa ukladá vedľa CSV súboru
+TEXT_COLUMN = "Text"
+
+# všetky binárne labely v datasete
+LABEL_COLUMNS = ["IsToxic", "IsAbusive", "IsThreat", "IsProvocative", "IsObscene", "IsHatespeech",
+                 "IsRacist", "IsNationalist", "IsSexist", "IsHomophobic", "IsReligiousHate", "IsRadicalism"]
+
+# -----------------------------------------------------------
+# Načítanie datasetu s cache
+# -----------------------------------------------------------
+# CSV sa parsuje raz: načítajú sa iba stĺpec s textom a stĺpce labelov s explicitnými
+# typmi a výsledok sa uloží do stĺpcovej cache (.npz) s kľúčom podľa hashu obsahu súboru.
+# Ďalšie procesy čítajú iba potrebné stĺpce z cache, v rámci procesu sa dataset drží v pamäti.
+_datasets = {}  # (cesta, mtime, veľkosť) -> slovník stĺpcov
+_lock = threading.Lock()
+
+def _file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _label_columns(path):
+    header = pd.read_csv(path, nrows=0).columns
+    return [label for label in LABEL_COLUMNS if label in header]
+
+def _parse_csv(path):
+    """
+    Načíta z CSV iba text a stĺpce labelov v jednom prechode.
+    """
+    labels = _label_columns(path)
+    data = pd.read_csv(path, usecols=[TEXT_COLUMN] + labels, keep_default_na=False,
+                       dtype={TEXT_COLUMN: str, **{label: bool for label in labels}})
+    columns = {TEXT_COLUMN: data[TEXT_COLUMN].tolist()}
+    for label in labels:
+        columns[label] = data[label].to_numpy()
+    return columns
+
+def _write_cache(cache_path, columns):
+    texts = columns[TEXT_COLUMN]
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum([len(text) for text in texts], out=offsets[1:])
+    arrays = {label: values for label, values in columns.items() if label != TEXT_COLUMN}
+    arrays["text_data"] = np.frombuffer("".join(texts).encode("utf-8", "surrogatepass"), dtype=np.uint8)
+    arrays["text_offsets"] = offsets
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path[:-len('.npz')]}.tmp{os.getpid()}.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, cache_path)
+
+class _CachedColumns:
+    """
+    Stĺpce z .npz cache, každý stĺpec sa načíta až pri prvom použití.
+    """
+    def __init__(self, cache_path):
+        self._npz = np.load(cache_path)
+        self._columns = {}
+
+    def __contains__(self, name):
+        return name == TEXT_COLUMN or name in self._npz.files
+
+    def __getitem__(self, name):
+        if name not in self._columns:
+            if name == TEXT_COLUMN:
+                # offsety sú v znakoch, preto stačí dekódovať raz a krájať reťazec
+                text = self._npz["text_data"].tobytes().decode("utf-8", "surrogatepass")
+                offsets = self._npz["text_offsets"].tolist()
+                self._columns[name] = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+            else:
+                self._columns[name] = self._npz[name]
+        return self._columns[name]
+
+def load_columns(path=DATA_FILE, use_cache=True):
+    """
+    Vráti stĺpce datasetu (text a všetky labely). CSV sa parsuje iba pri prvom
+    načítaní daného obsahu súboru, inak sa použije cache v pamäti alebo na disku.
+
+    Parameters
+    ----------
+    - path: cesta k CSV súboru
+    - use_cache: ak False, CSV sa vždy načíta znova a cache sa nepoužije
+
+    Returns
+    -------
+    - columns: objekt indexovaný názvom stĺpca ("Text" -> zoznam textov, label -> bool pole)
+    """
+    if not use_cache:
+        return _parse_csv(path)
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        columns = _datasets.get(key)
+        if columns is not None:
+            return columns
+        stem = os.path.splitext(os.path.basename(path))[0]
+        cache_path = os.path.join(os.path.dirname(path), CACHE_DIRNAME, f"{stem}-{_file_hash(path)}.npz")
+        if os.path.exists(cache_path):
+            columns = _CachedColumns(cache_path)
+        else:
+            columns = _parse_csv(path)
+            try:
+                _write_cache(cache_path, columns)
+            except OSError:
+                pass  # bez zapisovateľného priečinka sa dataset drží iba v pamäti
+        _datasets[key] = columns
+        return columns
+
 def load_data(label: str):
     """
     Načíta dáta zo súboru a vráti zoznam textov a príslušných labelov.
@@ -13,7 +126,46 @@ def load_data(label: str):
     - texts: zoznam textov
     - labels: zoznam labelov
     """
-    data = pd.read_csv("data/youtoxic_english_1000.csv")
-    texts = data['Text'].tolist()
-    labels = data[label].tolist()
-    return texts, labels
\ No newline at end of file
+    columns = load_columns()
+    texts = list(columns[TEXT_COLUMN])
+    labels = columns[label].tolist()
+    return texts, labels
+
+def load_multilabel_data(labels=LABEL_COLUMNS):
+    """
+    Načíta dáta zo súboru a vráti zoznam textov a vektory všetkých zadaných labelov.
+
+    Parameters
+    ----------
+    - labels: zoznam názvov stĺpcov s labelmi (štandardne všetky labely v datasete)
+
+    Returns
+    -------
+    - texts: zoznam textov
+    - label_vectors: zoznam vektorov labelov (jeden zoznam na text v poradí labels)
+    """
+    columns = load_columns()
+    texts = list(columns[TEXT_COLUMN])
+    label_vectors = np.stack([columns[label] for label in labels], axis=1).tolist()
+    return texts, label_vectors
+
+def iter_data_chunks(labels, chunk_size=10000, path=DATA_FILE):
+    """
+    Číta veľký dataset po blokoch, v pamäti je vždy iba jeden blok textov.
+    Načítajú sa iba stĺpec s textom a zadané labely.
+
+    Parameters
+    ----------
+    - labels: zoznam názvov stĺpcov s labelmi
+    - chunk_size: počet riadkov v bloku
+    - path: cesta k CSV súboru
+
+    Returns
+    -------
+    - generátor dvojíc (texts, label_matrix), label_matrix je bool pole (riadky x labely)
+    """
+    labels = list(labels)
+    reader = pd.read_csv(path, usecols=[TEXT_COLUMN] + labels, chunksize=chunk_size, keep_default_na=False,
+                         dtype={TEXT_COLUMN: str, **{label: bool for label in labels}})
+    for chunk in reader:
+        yield chunk[TEXT_COLUMN].tolist(), chunk[labels].to_numpy()
@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+
+# -----------------------------------------------------------
+# Voliteľné meranie času a počítadlá na horúcich cestách
+# -----------------------------------------------------------
+# Kód volá instrumentation.timer("stage") a instrumentation.count("name", n).
+# Kým meranie nie je zapnuté, timer vráti zdieľaný prázdny kontextový manažér
+# a count hneď skončí, takže cena je jedno volanie metódy na dávku.
+# Drahšie hodnoty (napr. počet neznámych slov) sa počítajú iba pod
+# podmienkou "if instrumentation.enabled".
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ("instrumentation", "name", "start")
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.instrumentation.record_time(self.name, time.perf_counter() - self.start)
+        return None
+
+class Instrumentation:
+    """
+    Rozdeľuje merania časov a počítadlá exportérom. Predvolene je vypnutá.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.exporters = []
+
+    def enable(self, *exporters):
+        """
+        Zapne meranie a pridá exportéry (ak žiadne nie sú, použije sa InMemoryExporter).
+
+        Returns
+        -------
+        - exporters: zoznam aktívnych exportérov
+        """
+        self.exporters.extend(exporters)
+        if not self.exporters:
+            self.exporters.append(InMemoryExporter())
+        self.enabled = True
+        return self.exporters
+
+    def disable(self):
+        """
+        Vypne meranie a odpojí exportéry.
+        """
+        self.enabled = False
+        self.exporters = []
+
+    def timer(self, name):
+        """
+        Kontextový manažér, ktorý zmeria čas bloku pod menom name.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def count(self, name, value=1):
+        """
+        Pripočíta hodnotu k počítadlu name.
+        """
+        if not self.enabled:
+            return
+        for exporter in self.exporters:
+            exporter.record_count(name, value)
+
+    def record_time(self, name, seconds):
+        if not self.enabled:
+            return
+        for exporter in self.exporters:
+            exporter.record_time(name, seconds)
+
+class InMemoryExporter:
+    """
+    Uchováva v pamäti súčty počítadiel a pre každý úsek počet meraní, celkový a najdlhší čas.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.timers = {}  # meno -> [počet, súčet sekúnd, maximum sekúnd]
+
+    def record_count(self, name, value):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_time(self, name, seconds):
+        with self._lock:
+            stats = self.timers.get(name)
+            if stats is None:
+                self.timers[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+    def snapshot(self):
+        """
+        Vráti aktuálne hodnoty.
+
+        Returns
+        -------
+        - snapshot: slovník {"counters": {...}, "timers": {meno: {count, total_s, mean_ms, max_ms}}}
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            timers = {name: {"count": count, "total_s": total, "mean_ms": total / count * 1000, "max_ms": peak * 1000}
+                      for name, (count, total, peak) in self.timers.items()}
+        return {"counters": counters, "timers": timers}
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+
+class LoggingExporter:
+    """
+    Zapisuje každé meranie do loggera (vhodné pri ladení, nie pri vysokom QPS).
+    """
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger("tcd.instrumentation")
+        self.level = level
+
+    def record_count(self, name, value):
+        self.logger.log(self.level, "%s += %s", name, value)
+
+    def record_time(self, name, seconds):
+        self.logger.log(self.level, "%s took %.3f ms", name, seconds * 1000)
+
+class PrometheusExporter(InMemoryExporter):
+    """
+    InMemoryExporter, ktorý vie hodnoty vypísať v textovom formáte Promethea.
+    """
+    def __init__(self, prefix="tcd"):
+        super().__init__()
+        self.prefix = prefix
+
+    @staticmethod
+    def _metric_name(name):
+        return "".join(c if c.isalnum() else "_" for c in name)
+
+    def render(self):
+        """
+        Returns
+        -------
+        - text: počítadlá ako counter <prefix>_<meno>_total, úseky ako summary <prefix>_<meno>_seconds
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"{self.prefix}_{self._metric_name(name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, stats in sorted(snapshot["timers"].items()):
+            metric = f"{self.prefix}_{self._metric_name(name)}_seconds"
+            lines += [f"# TYPE {metric} summary",
+                      f"{metric}_sum {stats['total_s']}",
+                      f"{metric}_count {stats['count']}"]
+        return "\n".join(lines) + "\n"
+
+# spoločná inštancia pre celý proces
+instrumentation = Instrumentation()
@@ -0,0 +1,64 @@
+import os
+import threading
+from utils.model_saver import load_best_model
+
+class ModelCache:
+    """
+    Cache načítaných modelov a ich metrík v rámci procesu.
+    Model sa zo súboru načíta iba raz a znova až vtedy, keď sa súbor zmení
+    (iný čas úpravy, veľkosť alebo inode, napr. po uložení lepšieho modelu).
+    """
+    def __init__(self, loader=load_best_model):
+        """
+        Parameters
+        ----------
+        - loader: funkcia, ktorá pre názov súboru vráti (model, metrics)
+        """
+        self.loader = loader
+        self._entries = {}  # súbor -> (podpis súboru, model, metriky)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(model_filename):
+        stat = os.stat(model_filename)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def get(self, model_filename):
+        """
+        Vráti model a metriky zo súboru, z cache, ak sa súbor odvtedy nezmenil.
+
+        Parameters
+        ----------
+        - model_filename: názov súboru s modelom
+
+        Returns
+        -------
+        - model: načítaný model alebo None, ak súbor neexistuje
+        - metrics: slovník metrík uložených spolu s modelom alebo None
+        """
+        try:
+            signature = self._signature(model_filename)
+        except FileNotFoundError:
+            self.invalidate(model_filename)
+            return None, None
+        with self._lock:
+            entry = self._entries.get(model_filename)
+            if entry is not None and entry[0] == signature:
+                return entry[1], entry[2]
+            model, metrics = self.loader(model_filename)
+            if model is not None:
+                self._entries[model_filename] = (signature, model, metrics)
+            return model, metrics
+
+    def invalidate(self, model_filename=None):
+        """
+        Odstráni model z cache (alebo všetky modely, ak model_filename je None).
+        """
+        with self._lock:
+            if model_filename is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(model_filename, None)
+
+# spoločná cache pre celý proces (Streamlit pri každom rerune spúšťa iba App.py, moduly ostávajú načítané)
+model_cache = ModelCache()
@@ -0,0 +1,341 @@
+import importlib
+import inspect
+import json
+import os
+import struct
+import numpy as np
+from algorithm.bagging import BaggingClassifier
+from algorithm.multilabel import MultiLabelBaggingClassifier
+from algorithm.naive_bayes import SimpleNaiveBayesClassifier
+from algorithm.sparse import FeatureHasher, csr_from_dense
+from algorithm.tokenizer import Tokenizer, default_tokenizer
+
+# -----------------------------------------------------------
+# Binárny formát modelov
+# -----------------------------------------------------------
+# Súbor tvorí pevná hlavička (magic, verzia, dĺžka JSON hlavičky, začiatok dát),
+# JSON hlavička s metrikami, parametrami (vrátane random_state a tokenizéra) a popisom polí a nakoniec súvislé
+# numerické polia zarovnané na 64 bajtov. Polia sa pri načítaní dajú namapovať
+# do pamäte (mmap), takže viac procesov zdieľa tie isté stránky súboru.
+# Verzia 2 pridáva modely s hashovanými slovami (bez tabuľky slovníka), verzia 3
+# ukladá počty slov BaggingClassifier riedko (iba nenulové hodnoty), verzia 4 pridáva
+# hashované slovné a znakové n-gramy (ngram_range, char_ngram_range). Súbor dostane
+# najnižšiu verziu, ktorá stačí, aby ho čítali aj staršie verzie kódu.
+MAGIC = b"TCDMODEL"
+FORMAT_VERSION = 4
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sIIQ")
+
+def is_model_file(filename):
+    """
+    Zistí, či súbor je v binárnom formáte modelu (a nie napr. starší pickle).
+
+    Parameters
+    ----------
+    - filename: cesta k súboru
+
+    Returns
+    -------
+    - True, ak súbor začína hlavičkou formátu
+    """
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _vocab_array(vocab_index):
+    if isinstance(vocab_index, FeatureHasher):
+        return np.zeros(0, dtype=np.uint8)
+    # tokeny predvoleného tokenizéra neobsahujú biele znaky, preto ich stačí spojiť znakom
+    # nového riadku; vlastný tokenizér ho môže vrátiť, taký token by tabuľku rozbil
+    for word in vocab_index:
+        if "\n" in word:
+            raise ValueError(f"Vocabulary token {word!r} contains a newline and cannot be stored in the model file")
+    # surrogatepass: token z dekódovaného vstupu môže obsahovať osamotený surrogate
+    return np.frombuffer("\n".join(vocab_index).encode("utf-8", "surrogatepass"), dtype=np.uint8)
+
+def _tokenizer_param(tokenizer):
+    """
+    Popis tokenizéra pre hlavičku: None pre spoločný default_tokenizer, parametre pre Tokenizer,
+    inak cesta k funkcii na úrovni modulu (module:qualname), ktorá sa pri načítaní importuje.
+    """
+    if inspect.ismethod(tokenizer) and isinstance(tokenizer.__self__, Tokenizer):
+        tokenizer = tokenizer.__self__
+    if tokenizer is None or tokenizer is default_tokenizer:
+        return None
+    if isinstance(tokenizer, Tokenizer):
+        return {"cache_size": tokenizer.cache_size}
+    module, name = getattr(tokenizer, "__module__", None), getattr(tokenizer, "__qualname__", "<unknown>")
+    if module is None or "<" in name:
+        raise ValueError("Only Tokenizer instances and module-level tokenizer functions can be saved "
+                         f"in the model file, got {tokenizer!r}")
+    return {"function": f"{module}:{name}"}
+
+def _load_tokenizer(param):
+    if param is None:
+        return None
+    if "function" not in param:
+        return Tokenizer(**param)
+    module, name = param["function"].split(":")
+    tokenizer = importlib.import_module(module)
+    for part in name.split("."):
+        tokenizer = getattr(tokenizer, part)
+    return tokenizer
+
+def _random_state_param(random_state):
+    # seed je int alebo postupnosť intov (ako pre np.random.SeedSequence), JSON nepozná numpy typy
+    return None if random_state is None else np.asarray(random_state).tolist()
+
+def _bagging_arrays(model):
+    """
+    Rozloží BaggingClassifier na hlavičku a polia nad spoločným slovníkom.
+    Riedke počty slov modelov (CSR) sa spoja do jednej matice s riadkom pre každú dvojicu
+    (model, trieda), keďže každý model videl iba časť slov v každej triede.
+    """
+    model._ensure_compiled()
+    model._share_vocabulary()
+    n_estimators, n_classes = model.log_priors.shape
+    n_words = len(model.vocab_index)
+    class_counts = np.zeros((n_estimators, n_classes))
+    vocab_sizes = np.zeros(n_estimators, dtype=np.int64)
+    # riadky (model, trieda) v poradí tried ensemble, trieda, ktorú model nevidel, má prázdny riadok
+    row_columns = [[np.zeros(0, dtype=np.int64)] * n_classes for _ in range(n_estimators)]
+    row_counts = [[np.zeros(0)] * n_classes for _ in range(n_estimators)]
+    for e, estimator in enumerate(model.estimators):
+        for row, label in enumerate(estimator.classes):
+            c = model.classes.index(label)
+            class_counts[e, c] = estimator.class_counts[label]
+            start, end = estimator.count_indptr[row], estimator.count_indptr[row + 1]
+            row_columns[e][c] = estimator.count_indices[start:end]
+            row_counts[e][c] = estimator.count_data[start:end]
+        vocab_sizes[e] = estimator.vocab_size
+    count_indptr = np.zeros(n_estimators * n_classes + 1, dtype=np.int64)
+    np.cumsum([len(columns) for columns_e in row_columns for columns in columns_e], out=count_indptr[1:])
+    header = {
+        "model": "BaggingClassifier",
+        "params": {"n_estimators": n_estimators, "max_samples": model.max_samples,
+                   "alpha": model.estimators[0].alpha, "min_df": getattr(model, "min_df", 1),
+                   "max_vocab_size": getattr(model, "max_vocab_size", None),
+                   "stop_words": sorted(getattr(model, "stop_words", ())),
+                   "random_state": _random_state_param(getattr(model, "random_state", None)),
+                   "n_updates": getattr(model, "n_updates", 0),
+                   "tokenizer": _tokenizer_param(getattr(model, "tokenizer", None))},
+        "classes": list(model.classes),
+        "n_words": n_words,
+    }
+    arrays = {
+        "vocab": _vocab_array(model.vocab_index),
+        "class_counts": class_counts,
+        "count_indptr": count_indptr,
+        "count_indices": np.concatenate([c for columns_e in row_columns for c in columns_e]).astype(np.int32),
+        "count_data": np.concatenate([d for counts_e in row_counts for d in counts_e]).astype(np.float64),
+        "vocab_sizes": vocab_sizes,
+        "log_priors": model.log_priors,
+        "log_probs": model.log_probs,
+    }
+    return header, arrays
+
+def _multilabel_arrays(model):
+    """
+    Rozloží MultiLabelBaggingClassifier na hlavičku a polia.
+    """
+    header = {
+        "model": "MultiLabelBaggingClassifier",
+        "params": {"n_estimators": model.n_estimators, "max_samples": model.max_samples,
+                   "alpha": model.alpha, "random_state": _random_state_param(getattr(model, "random_state", None)),
+                   "tokenizer": _tokenizer_param(getattr(model, "tokenizer", None))},
+        "labels": model.labels,
+        "n_words": len(model.vocab_index),
+    }
+    arrays = {
+        "vocab": _vocab_array(model.vocab_index),
+        "log_prior_ratios": model.log_prior_ratios,
+        "log_ratios": model.log_ratios,
+    }
+    return header, arrays
+
+def save_model(model, metrics, filename):
+    """
+    Uloží model a jeho metriky do binárneho formátu.
+
+    Parameters
+    ----------
+    - model: BaggingClassifier alebo MultiLabelBaggingClassifier
+    - metrics: slovník metrík modelu
+    - filename: cesta k súboru
+    """
+    if isinstance(model, BaggingClassifier):
+        header, arrays = _bagging_arrays(model)
+    elif isinstance(model, MultiLabelBaggingClassifier):
+        header, arrays = _multilabel_arrays(model)
+    else:
+        raise TypeError(f"Unsupported model type: {type(model).__name__}")
+
+    version = 1
+    if isinstance(model.vocab_index, FeatureHasher):
+        header["n_features"] = model.vocab_index.n_features
+        version = 2
+    if "count_indptr" in arrays:
+        version = 3
+    if isinstance(model.vocab_index, FeatureHasher) and (model.vocab_index.ngram_range != (1, 1)
+                                                         or model.vocab_index.char_ngram_range is not None):
+        header["ngram_range"] = list(model.vocab_index.ngram_range)
+        header["char_ngram_range"] = model.vocab_index.char_ngram_range and list(model.vocab_index.char_ngram_range)
+        version = 4
+    header["format_version"] = version
+    header["metrics"] = metrics
+    header["arrays"] = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_offset = _aligned(_PREAMBLE.size + len(header_bytes))
+    # zápis do dočasného súboru a premenovanie: procesy, ktoré majú starý súbor
+    # namapovaný v pamäti, ďalej čítajú pôvodné dáta a nikdy nevidia polovičný súbor
+    tmp_filename = f"{filename}.tmp{os.getpid()}"
+    with open(tmp_filename, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, version, len(header_bytes), data_offset))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_offset + header["arrays"][name]["offset"])
+            array.tofile(f)
+    os.replace(tmp_filename, filename)
+
+def read_header(filename):
+    """
+    Načíta iba hlavičku súboru (metriky, parametre, popis polí) bez numerických dát.
+
+    Parameters
+    ----------
+    - filename: cesta k súboru
+
+    Returns
+    -------
+    - header: slovník hlavičky, obsahuje aj kľúč "data_offset"
+    """
+    with open(filename, "rb") as f:
+        magic, version, header_length, data_offset = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a model file")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format version {version} (supported up to {FORMAT_VERSION})")
+        header = json.loads(f.read(header_length).decode("utf-8"))
+    header["data_offset"] = data_offset
+    return header
+
+def _read_arrays(filename, header, mmap):
+    """
+    Vráti polia zo súboru, pri mmap=True ako pohľady do jednej pamäťovo mapovanej oblasti.
+    """
+    if mmap:
+        buffer = np.memmap(filename, dtype=np.uint8, mode="r")
+    else:
+        buffer = np.fromfile(filename, dtype=np.uint8)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        start = header["data_offset"] + spec["offset"]
+        size = int(np.prod(spec["shape"], dtype=np.int64)) * dtype.itemsize
+        arrays[name] = buffer[start:start + size].view(dtype).reshape(spec["shape"])
+    return arrays
+
+def _ngram_params(header):
+    char_ngram_range = header.get("char_ngram_range")
+    return tuple(header.get("ngram_range", (1, 1))), char_ngram_range and tuple(char_ngram_range)
+
+def _vocab_index(header, vocab):
+    if "n_features" in header:
+        return FeatureHasher(header["n_features"], *_ngram_params(header))
+    if header["n_words"] == 0:
+        return {}
+    return {word: idx for idx, word in enumerate(vocab.tobytes().decode("utf-8", "surrogatepass").split("\n"))}
+
+def _load_bagging(header, arrays):
+    """
+    Zostaví BaggingClassifier z polí súboru bez ich kopírovania.
+    """
+    params = header["params"]
+    ngram_range, char_ngram_range = _ngram_params(header)
+    model = BaggingClassifier(SimpleNaiveBayesClassifier, n_estimators=params["n_estimators"],
+                              max_samples=params["max_samples"], n_features=header.get("n_features"),
+                              min_df=params.get("min_df", 1), max_vocab_size=params.get("max_vocab_size"),
+                              stop_words=params.get("stop_words"), ngram_range=ngram_range,
+                              char_ngram_range=char_ngram_range, random_state=params.get("random_state"),
+                              tokenizer=_load_tokenizer(params.get("tokenizer")))
+    model.n_updates = params.get("n_updates", 0)
+    model.classes = header["classes"]
+    model.vocab_index = _vocab_index(header, arrays["vocab"])
+    model.log_priors = arrays["log_priors"]
+    model.log_probs = arrays["log_probs"]
+    n_classes = len(model.classes)
+    for e in range(params["n_estimators"]):
+        estimator = SimpleNaiveBayesClassifier(alpha=params["alpha"], tokenizer=model.tokenizer)
+        present = arrays["class_counts"][e] > 0
+        # ak model pozná všetky triedy, použijeme pohľady do súboru namiesto kópií
+        rows = slice(None) if present.all() else np.flatnonzero(present)
+        estimator.classes = [label for label, keep in zip(model.classes, present) if keep]
+        estimator.class_counts = dict(zip(estimator.classes, arrays["class_counts"][e, rows].tolist()))
+        estimator.total_docs = sum(estimator.class_counts.values())
+        estimator.class_priors = {label: count / estimator.total_docs for label, count in estimator.class_counts.items()}
+        estimator.vocab_index = model.vocab_index
+        estimator.vocab_size = int(arrays["vocab_sizes"][e])
+        if "count_indptr" in arrays:
+            # riedke počty modelu sú súvislý úsek súboru, chýbajúce triedy majú prázdne riadky
+            row_ptr = arrays["count_indptr"][e * n_classes:(e + 1) * n_classes + 1]
+            start, end = int(row_ptr[0]), int(row_ptr[-1])
+            estimator.count_indptr = np.concatenate(([0], row_ptr[1:][present] - start))
+            estimator.count_indices = arrays["count_indices"][start:end]
+            estimator.count_data = arrays["count_data"][start:end]
+        else:
+            estimator.count_indptr, estimator.count_indices, estimator.count_data = \
+                csr_from_dense(arrays["feature_counts"][e, rows])
+        estimator.log_priors = arrays["log_priors"][e, rows]
+        estimator.log_probs = arrays["log_probs"][e, rows]
+        model.estimators.append(estimator)
+    model._build_contributions()
+    return model
+
+def _load_multilabel(header, arrays):
+    """
+    Zostaví MultiLabelBaggingClassifier z polí súboru bez ich kopírovania.
+    """
+    params = header["params"]
+    ngram_range, char_ngram_range = _ngram_params(header)
+    model = MultiLabelBaggingClassifier(header["labels"], n_estimators=params["n_estimators"],
+                                        max_samples=params["max_samples"], alpha=params["alpha"],
+                                        n_features=header.get("n_features"), ngram_range=ngram_range,
+                                        char_ngram_range=char_ngram_range, random_state=params.get("random_state"),
+                                        tokenizer=_load_tokenizer(params.get("tokenizer")))
+    model.vocab_index = _vocab_index(header, arrays["vocab"])
+    model.log_prior_ratios = arrays["log_prior_ratios"]
+    model.log_ratios = arrays["log_ratios"]
+    return model
+
+def load_model(filename, mmap=True):
+    """
+    Načíta model a metriky z binárneho formátu.
+
+    Parameters
+    ----------
+    - filename: cesta k súboru
+    - mmap: ak True, numerické polia sa mapujú do pamäte iba na čítanie a zdieľajú sa medzi procesmi
+
+    Returns
+    -------
+    - model: načítaný model
+    - metrics: slovník metrík modelu
+    """
+    header = read_header(filename)
+    arrays = _read_arrays(filename, header, mmap)
+    if header["model"] == "BaggingClassifier":
+        model = _load_bagging(header, arrays)
+    elif header["model"] == "MultiLabelBaggingClassifier":
+        model = _load_multilabel(header, arrays)
+    else:
+        raise ValueError(f"Unknown model type in {filename}: {header['model']}")
+    return model, header["metrics"]
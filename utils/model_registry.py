@@ -0,0 +1,363 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from utils.instrumentation import instrumentation
+from utils.model_format import is_model_file, load_model, read_header, save_model
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# -----------------------------------------------------------
+# Register verzií modelov
+# -----------------------------------------------------------
+# models/registry/<label>/<verzia>.tcd   nemenný artefakt v binárnom formáte
+# models/registry/<label>/<verzia>.json  metadáta (metriky, hash dát, parametre, časy)
+# models/registry/<label>/CURRENT        ukazovateľ na aktuálnu verziu
+# models/registry/<label>/.lock          zámok pre zápis (viac procesov aj vlákien)
+# models/best_model_<label>.pkl          pevný odkaz na aktuálnu verziu pre staršie čítačky
+#
+# Všetky súbory sa zapisujú do dočasného súboru a premenujú (os.replace), takže čitateľ
+# vidí buď starý, alebo nový súbor, nikdy polovičný. Porovnanie s aktuálnym modelom
+# a prepnutie ukazovateľa prebiehajú pod zámkom, súbežné ukladania sa teda nepredbehnú.
+# Pod tým istým zámkom register po uložení zmaže verzie staršie ako posledných
+# keep_versions (okrem aktuálnej).
+
+REGISTRY_DIRNAME = "registry"
+CURRENT_FILENAME = "CURRENT"
+
+# funkcie volané po každom prepnutí aktuálnej verzie (napr. invalidácia cache výsledkov)
+_save_listeners = []
+
+def add_save_listener(listener):
+    """
+    Zaregistruje funkciu listener(model_filename), ktorá sa zavolá vždy, keď sa
+    v registri zmení aktuálna verzia modelu (register s promote, promote aj
+    auto_save_best_model). model_filename je súbor best_model_<label>.pkl.
+    """
+    _save_listeners.append(listener)
+
+def read_saved_metrics(model_filename):
+    """
+    Načíta iba metriky uloženého modelu. Pri binárnom formáte stačí prečítať hlavičku.
+
+    Parameters
+    ----------
+    - model_filename: názov súboru s modelom
+
+    Returns
+    -------
+    - metrics: slovník metrík modelu
+    """
+    if is_model_file(model_filename):
+        return read_header(model_filename)["metrics"]
+    with open(model_filename, "rb") as f:
+        return pickle.load(f)["metrics"]
+
+def load_model_file(model_filename, mmap=True):
+    """
+    Načíta model zo súboru v binárnom formáte alebo zo staršieho pickle.
+
+    Returns
+    -------
+    - model: načítaný model
+    - metrics: slovník metrík modelu
+    """
+    if is_model_file(model_filename):
+        return load_model(model_filename, mmap=mmap)
+    with open(model_filename, "rb") as f:
+        data = pickle.load(f)
+    return data["model"], data["metrics"]
+
+def data_fingerprint(texts, labels):
+    """
+    Vypočíta odtlačok trénovacích dát (textov aj labelov) pre metadáta verzie.
+
+    Returns
+    -------
+    - data_hash: hexadecimálny reťazec
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for text, label in zip(texts, labels):
+        digest.update(f"{label}\t{text}\n".encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+def _write_atomic(filename, data):
+    tmp_filename = f"{filename}.tmp{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_filename, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_filename, filename)
+
+def _timestamp():
+    return time.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+@contextmanager
+def _file_lock(filename):
+    # flock aj msvcrt.locking zamykajú otvorený súbor, takže vylučujú aj vlákna jedného procesu
+    with open(filename, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK to po 10 s vzdá
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+class ModelRegistry:
+    """
+    Verzované úložisko modelov pre jednotlivé labely s ukazovateľom na aktuálnu verziu.
+    Bezpečné pre súbežné ukladanie z viacerých procesov (tréning, Streamlit relácie)
+    a pre čitateľov, ktorí si pri zmene ukazovateľa lacno načítajú novú verziu (current).
+    """
+    def __init__(self, models_dir="models", check_interval=1.0, keep_versions=10):
+        """
+        Parameters
+        ----------
+        - models_dir: priečinok s modelmi, register je v jeho podpriečinku registry
+        - check_interval: najkratší čas v sekundách medzi kontrolami ukazovateľa v current
+        - keep_versions: počet posledných verzií, ktoré register ponechá (aktuálna verzia
+                         sa ponechá vždy), staršie sa pri register zmažú; ak None, nemaže sa nič
+        """
+        self.models_dir = models_dir
+        self.check_interval = check_interval
+        self.keep_versions = keep_versions
+        self._loaded = {}  # label -> (čas kontroly, podpis ukazovateľa, model, metadáta)
+        self._loaded_lock = threading.Lock()
+
+    def _label_dir(self, label):
+        return os.path.join(self.models_dir, REGISTRY_DIRNAME, label)
+
+    def _artifact(self, label, version):
+        return os.path.join(self._label_dir(label), f"{version}.tcd")
+
+    def published_filename(self, label):
+        """
+        Vráti cestu k súboru best_model_<label>.pkl, ktorý vždy obsahuje aktuálnu verziu.
+        """
+        return os.path.join(self.models_dir, f"best_model_{label}.pkl")
+
+    @contextmanager
+    def lock(self, label):
+        """
+        Zamkne register pre label (výlučne medzi procesmi aj vláknami).
+        """
+        os.makedirs(self._label_dir(label), exist_ok=True)
+        with _file_lock(os.path.join(self._label_dir(label), ".lock")):
+            yield
+
+    def versions(self, label):
+        """
+        Vráti metadáta všetkých verzií pre label od najstaršej.
+        """
+        try:
+            names = os.listdir(self._label_dir(label))
+        except FileNotFoundError:
+            return []
+        return [self.metadata(label, name[:-5]) for name in sorted(names) if name.endswith(".json")]
+
+    def metadata(self, label, version):
+        """
+        Vráti metadáta verzie: version, label, created_at, metrics, data_hash, params,
+        model, format_version, size_bytes.
+        """
+        with open(os.path.join(self._label_dir(label), f"{version}.json")) as f:
+            return json.load(f)
+
+    def current_version(self, label):
+        """
+        Vráti aktuálnu verziu pre label alebo None, ak žiadna nie je.
+        """
+        try:
+            with open(os.path.join(self._label_dir(label), CURRENT_FILENAME)) as f:
+                return json.load(f)["version"]
+        except FileNotFoundError:
+            return None
+
+    def _current_metrics(self, label):
+        version = self.current_version(label)
+        if version is not None:
+            return self.metadata(label, version)["metrics"]
+        try:  # model uložený pred zavedením registra
+            return read_saved_metrics(self.published_filename(label))
+        except Exception:
+            return None
+
+    def register(self, label, model, metrics, data_hash=None, params=None, promote=True, metric="F1 Score"):
+        """
+        Uloží model ako novú verziu a voliteľne ju nastaví ako aktuálnu.
+
+        Parameters
+        ----------
+        - label: názov stĺpca s labelmi (napr. "IsToxic")
+        - model: BaggingClassifier alebo MultiLabelBaggingClassifier
+        - metrics: slovník metrík modelu
+        - data_hash: odtlačok trénovacích dát (napr. z data_fingerprint)
+        - params: ďalšie parametre tréningu, doplnia parametre modelu z hlavičky súboru
+        - promote: True, False alebo "if_better" (iba ak je metric lepšia ako pri aktuálnej verzii)
+        - metric: metrika porovnávaná pri promote="if_better"
+
+        Returns
+        -------
+        - metadata: metadáta novej verzie doplnené o kľúč "promoted"
+        """
+        with self.lock(label):
+            existing = [meta["version"] for meta in self.versions(label)]
+            version = f"{int(existing[-1]) + 1 if existing else 1:06d}"
+            artifact = self._artifact(label, version)
+            save_model(model, metrics, artifact)
+            header = read_header(artifact)
+            metadata = {
+                "version": version,
+                "label": label,
+                "created_at": _timestamp(),
+                "metrics": metrics,
+                "data_hash": data_hash,
+                "params": {**header["params"], **(params or {})},
+                "model": header["model"],
+                "format_version": header["format_version"],
+                "size_bytes": os.path.getsize(artifact),
+            }
+            _write_atomic(os.path.join(self._label_dir(label), f"{version}.json"),
+                          json.dumps(metadata, indent=2).encode("utf-8"))
+
+            if promote == "if_better":
+                current = self._current_metrics(label)
+                promote = current is None or metrics[metric] > current[metric]
+            if promote:
+                self._set_current(label, version)
+            self._prune(label, [*existing, version])
+        instrumentation.count("registry.versions")
+        return {**metadata, "promoted": bool(promote)}
+
+    def promote(self, label, version):
+        """
+        Nastaví existujúcu verziu ako aktuálnu (aj návrat k staršej verzii).
+        """
+        with self.lock(label):
+            if not os.path.exists(self._artifact(label, version)):
+                raise FileNotFoundError(f"No version {version} of {label} in the registry")
+            self._set_current(label, version)
+
+    def _prune(self, label, versions):
+        # volá sa pod zámkom; artefakt, ktorý má niekto namapovaný, ostane čitateľný (POSIX),
+        # kde sa zmazať nedá (Windows), zmaže ho niektoré z ďalších volaní
+        if self.keep_versions is None:
+            return
+        # najnovšia verzia ostáva vždy, od nej sa číslujú ďalšie
+        keep = set(versions[-max(self.keep_versions, 1):])
+        keep.add(self.current_version(label))
+        for version in versions:
+            if version in keep:
+                continue
+            for filename in (self._artifact(label, version),
+                             os.path.join(self._label_dir(label), f"{version}.json")):
+                try:
+                    os.remove(filename)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    break
+            else:
+                instrumentation.count("registry.pruned")
+
+    def _set_current(self, label, version):
+        # best_model_<label>.pkl je pevný odkaz na nemenný artefakt (kópia, ak to súborový
+        # systém nepodporuje), staršie čítačky a ModelCache tak vidia zmenu inode
+        published = self.published_filename(label)
+        tmp_filename = f"{published}.tmp{os.getpid()}"
+        try:
+            os.link(self._artifact(label, version), tmp_filename)
+        except OSError:
+            shutil.copyfile(self._artifact(label, version), tmp_filename)
+        os.replace(tmp_filename, published)
+        _write_atomic(os.path.join(self._label_dir(label), CURRENT_FILENAME),
+                      json.dumps({"version": version, "promoted_at": _timestamp()}).encode("utf-8"))
+        for listener in _save_listeners:
+            listener(published)
+
+    def load(self, label, version=None, mmap=True):
+        """
+        Načíta verziu modelu (predvolene aktuálnu).
+
+        Returns
+        -------
+        - model: načítaný model
+        - metadata: metadáta verzie
+        """
+        version = version or self.current_version(label)
+        if version is None:
+            raise FileNotFoundError(f"No current version of {label} in the registry")
+        model, _ = load_model(self._artifact(label, version), mmap=mmap)
+        return model, self.metadata(label, version)
+
+    def _pointer_signature(self, label):
+        try:
+            stat = os.stat(os.path.join(self._label_dir(label), CURRENT_FILENAME))
+            return "registry", stat.st_mtime_ns, stat.st_ino
+        except FileNotFoundError:
+            pass
+        try:
+            stat = os.stat(self.published_filename(label))
+            return "published", stat.st_mtime_ns, stat.st_size, stat.st_ino
+        except FileNotFoundError:
+            return None
+
+    def current(self, label):
+        """
+        Vráti aktuálny model pre label. Model sa drží v pamäti a znova sa načíta iba vtedy,
+        keď sa zmení ukazovateľ (kontroluje sa najviac raz za check_interval, stačí os.stat).
+        Kým register label nepozná, použije sa best_model_<label>.pkl.
+
+        Returns
+        -------
+        - model: aktuálny model
+        - metadata: metadáta verzie (pri modeli mimo registra iba "version": None a "metrics")
+        """
+        now = time.monotonic()
+        with self._loaded_lock:
+            entry = self._loaded.get(label)
+            if entry is not None and now - entry[0] < self.check_interval:
+                return entry[2], entry[3]
+            signature = self._pointer_signature(label)
+            if entry is not None and entry[1] == signature:
+                self._loaded[label] = (now, *entry[1:])
+                return entry[2], entry[3]
+            if signature is None:
+                raise FileNotFoundError(f"No saved model found for {label} in {self.models_dir}")
+            with instrumentation.timer("model.load"):
+                if signature[0] == "registry":
+                    model, metadata = self.load(label)
+                else:
+                    model, metrics = load_model_file(self.published_filename(label))
+                    metadata = {"version": None, "label": label, "metrics": metrics}
+                model.predict([])  # staršie modely sa kompilujú pri prvej predikcii
+            instrumentation.count("registry.reloads")
+            self._loaded[label] = (now, signature, model, metadata)
+            return model, metadata
+
+    def loaded_versions(self):
+        """
+        Vráti verzie modelov, ktoré current práve drží v pamäti (label -> verzia).
+        """
+        with self._loaded_lock:
+            return {label: entry[3]["version"] for label, entry in self._loaded.items()}
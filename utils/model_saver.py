@@ -1,46 +1,55 @@
-import pickle
 import streamlit as st
+from utils.instrumentation import instrumentation
+from utils.model_registry import ModelRegistry, add_save_listener, load_model_file
 
-def auto_save_best_model(model, metrics, model_filename):
+def auto_save_best_model(model, metrics, label, models_dir="models", data_hash=None, params=None,
+                         promote="if_better"):
     """
-    Automaticky uloží model na disk, ak je lepší ako najlepší uložený model.
+    Uloží model ako novú verziu v registri (utils.model_registry) a nastaví ju ako aktuálnu,
+    ak je lepšia ako doteraz najlepší model (podľa F1). Porovnanie aj prepnutie prebiehajú
+    pod zámkom, takže súbežné tréningy ani Streamlit relácie sa neprepíšu. Funkcie
+    zaregistrované cez add_save_listener zavolá register pri prepnutí verzie.
 
     Parameters
     ----------
     - model: natrénovaný model
     - metrics: slovník metrík modelu
-    - model_filename: názov súboru, do ktorého sa má model uložiť
-    """
-    try:
-        with open(model_filename, "rb") as f:
-            best_data = pickle.load(f)
-        best_f1 = best_data["metrics"]["F1 Score"]
-    except Exception:
-        best_f1 = -1.0  # No best model exists yet
+    - label: názov stĺpca s labelmi (napr. "IsToxic"), model je potom v models/best_model_<label>.pkl
+    - models_dir: priečinok s modelmi
+    - data_hash: odtlačok trénovacích dát (napr. z data_fingerprint)
+    - params: ďalšie parametre tréningu uložené v metadátach verzie
+    - promote: "if_better" (porovnanie podľa F1 s uloženými metrikami) alebo True/False, ak o prepnutí
+               rozhodol volajúci (napr. porovnaním priemerov z krížovej validácie v model_selection)
 
-    if metrics["F1 Score"] > best_f1:
-        with open(model_filename, "wb") as f:
-            pickle.dump({"model": model, "metrics": metrics}, f)
+    Returns
+    -------
+    - metadata: metadáta uloženej verzie, kľúč "promoted" hovorí, či sa stala aktuálnou
+    """
+    registry = ModelRegistry(models_dir)
+    metadata = registry.register(label, model, metrics, data_hash, params, promote=promote)
+    if metadata["promoted"]:
         st.sidebar.success("Automatically saved new best model!")
     else:
         st.sidebar.info("Current model not better than the best saved model.")
+    return metadata
 
-def load_best_model(model_filename):
+def load_best_model(model_filename, mmap=True):
     """
-    Načíta model zo súboru.
+    Načíta model zo súboru. Binárny formát sa namapuje do pamäte,
+    staršie modely uložené cez pickle sa načítajú ako predtým.
 
     Parameters
     ----------
     - model_filename: názov súboru, z ktorého sa má model načíta
+    - mmap: ak True, polia modelu sa zdieľajú medzi procesmi cez mmap
 
     Returns
     -------
-    - best_data["model"]: natrénovaný model
-    - best_data["metrics"]: slovník metrík modelu
+    - model: natrénovaný model
+    - metrics: slovník metrík modelu
     """
     try:
-        with open(model_filename, "rb") as f:
-            best_data = pickle.load(f)
-        return best_data["model"], best_data["metrics"]
+        with instrumentation.timer("model.load"):
+            return load_model_file(model_filename, mmap=mmap)
     except Exception:
-        return None, None
\ No newline at end of file
+        return None, None
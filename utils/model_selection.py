@@ -0,0 +1,245 @@
+import argparse
+import functools
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from algorithm.bagging import BaggingClassifier
+from algorithm.naive_bayes import SimpleNaiveBayesClassifier
+from algorithm.sparse import build_vocab, encode, take_rows, term_counts
+from algorithm.tokenizer import default_tokenizer
+from metrics.evaluation import evaluate_predictions
+from utils.data_loader import load_data
+from utils.model_registry import ModelRegistry, data_fingerprint
+from utils.model_saver import auto_save_best_model
+
+# -----------------------------------------------------------
+# Krížová validácia a hľadanie hyperparametrov
+# -----------------------------------------------------------
+DEFAULT_GRID = {
+    "alpha": [0.5, 1.0, 2.0],
+    "n_estimators": [5, 10, 20],
+    "max_samples": [0.5, 1.0],
+}
+METRIC_NAMES = ("Accuracy", "Precision", "Recall", "F1 Score")
+
+def stratified_kfold(labels, n_splits=5, random_state=None):
+    """
+    Rozdelí indexy dokumentov do n_splits častí tak, aby každá časť mala
+    približne rovnaký pomer tried ako celé dáta.
+
+    Parameters
+    ----------
+    - labels: zoznam tried dokumentov
+    - n_splits: počet častí (foldov)
+    - random_state: seed náhodného premiešania
+
+    Returns
+    -------
+    - folds: zoznam dvojíc (trénovacie indexy, testovacie indexy)
+    """
+    rng = np.random.default_rng(random_state)
+    _, codes = np.unique(np.asarray(labels), return_inverse=True)
+    fold_of = np.empty(len(codes), dtype=np.int64)
+    offset = 0
+    for code in range(codes.max() + 1 if len(codes) else 0):
+        members = rng.permutation(np.flatnonzero(codes == code))
+        # pokračujeme v číslovaní foldov, aby sa zvyšky tried nehromadili v prvom folde
+        fold_of[members] = (offset + np.arange(len(members))) % n_splits
+        offset += len(members)
+    return [(np.flatnonzero(fold_of != fold), np.flatnonzero(fold_of == fold)) for fold in range(n_splits)]
+
+def parameter_grid(grid):
+    """
+    Vráti všetky kombinácie hodnôt z mriežky parametrov.
+
+    Parameters
+    ----------
+    - grid: slovník parameter -> zoznam hodnôt
+
+    Returns
+    -------
+    - configs: zoznam slovníkov parameter -> hodnota
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def make_model(config, n_train, random_state=None):
+    """
+    Vytvorí BaggingClassifier pre nastavenie z mriežky.
+    max_samples do 1.0 (float) je podiel trénovacích dát, inak počet vzoriek.
+    """
+    max_samples = config.get("max_samples")
+    if isinstance(max_samples, float) and max_samples <= 1.0:
+        max_samples = max(int(round(max_samples * n_train)), 1)
+    return BaggingClassifier(functools.partial(SimpleNaiveBayesClassifier, alpha=config.get("alpha", 1.0)),
+                             n_estimators=config.get("n_estimators", 10), max_samples=max_samples,
+                             random_state=random_state)
+
+# tokenizované dáta a foldy zdieľané procesmi, nastavené v _init_worker
+_shared_corpus = None
+
+def _init_worker(corpus):
+    global _shared_corpus
+    _shared_corpus = corpus
+
+def _evaluate_fold(config, fold, corpus=None):
+    """
+    Natrénuje nastavenie na trénovacej časti foldu a vyhodnotí ho na testovacej časti.
+    Používa počty slov spočítané raz pre celý dataset.
+    """
+    indptr, indices, data, y, vocab_index, folds, random_state = corpus or _shared_corpus
+    train_rows, test_rows = folds[fold]
+    model = make_model(config, len(train_rows), random_state)
+    train_indptr, train_indices, train_data = take_rows(indptr, indices, data, train_rows)
+    model.fit_encoded(train_indptr, train_indices, train_data, [y[i] for i in train_rows], vocab_index)
+    test_indptr, test_indices, test_data = take_rows(indptr, indices, data, test_rows)
+    predictions = model.predict_encoded(test_indptr, test_indices, test_data)
+    return evaluate_predictions([y[i] for i in test_rows], predictions)
+
+def cross_validate_grid(texts, labels, grid=DEFAULT_GRID, n_splits=5, n_jobs=1, random_state=0):
+    """
+    Stratifikovaná k-fold krížová validácia pre všetky nastavenia z mriežky.
+    Texty sa tokenizujú raz; všetky foldy a nastavenia používajú tie isté počty slov
+    nad spoločným slovníkom. Slová, ktoré sa v trénovacej časti foldu nevyskytujú,
+    majú nulové počty, takže model sa správa rovnako, ako keby ich slovník neobsahoval.
+    Dvojice (nastavenie, fold) sa vyhodnocujú paralelne v procesoch.
+
+    Parameters
+    ----------
+    - texts: zoznam textov
+    - labels: zoznam tried
+    - grid: slovník parameter -> zoznam hodnôt (alpha, n_estimators, max_samples)
+    - n_splits: počet foldov
+    - n_jobs: počet procesov, None alebo -1 použije všetky jadrá
+    - random_state: seed rozdelenia do foldov aj bootstrap vzoriek
+
+    Returns
+    -------
+    - leaderboard: zoznam výsledkov zoradený podľa priemerného F1, každý výsledok
+                   obsahuje "params", "mean", "std" a "folds" (metriky jednotlivých foldov)
+    """
+    tokens = [default_tokenizer(text) for text in texts]
+    vocab_index = build_vocab(tokens)
+    indptr, indices = encode(tokens, vocab_index, len(vocab_index))
+    indptr, indices, data = term_counts(indptr, indices, len(vocab_index))
+    folds = stratified_kfold(labels, n_splits, random_state)
+    corpus = (indptr, indices, data, list(labels), vocab_index, folds, random_state)
+
+    configs = parameter_grid(grid)
+    tasks = [(config, fold) for config in configs for fold in range(n_splits)]
+    n_jobs = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+    if n_jobs == 1:
+        results = [_evaluate_fold(config, fold, corpus) for config, fold in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(corpus,)) as pool:
+            results = list(pool.map(_evaluate_fold, *zip(*tasks)))
+
+    leaderboard = []
+    for i, config in enumerate(configs):
+        fold_metrics = results[i * n_splits:(i + 1) * n_splits]
+        values = {name: np.array([metrics[name] for metrics in fold_metrics]) for name in METRIC_NAMES}
+        leaderboard.append({
+            "params": config,
+            "mean": {name: float(values[name].mean()) for name in METRIC_NAMES},
+            "std": {name: float(values[name].std()) for name in METRIC_NAMES},
+            "folds": fold_metrics,
+        })
+    leaderboard.sort(key=lambda row: row["mean"]["F1 Score"], reverse=True)
+    return leaderboard
+
+def current_cv_score(label, texts, labels, n_splits=5, n_jobs=1, random_state=0, models_dir="models"):
+    """
+    Vráti priemerné F1 aktuálneho modelu pre label z krížovej validácie na tých istých foldoch,
+    aby sa dalo porovnať s výsledkami cross_validate_grid. Ak aktuálna verzia vznikla
+    krížovou validáciou s rovnakými foldmi (cv_folds, cv_seed, hash dát), použije sa jej
+    uložené F1, inak sa jej nastavenie (alpha, n_estimators, max_samples) vyhodnotí znova.
+
+    Parameters
+    ----------
+    - label: názov stĺpca s labelmi (napr. "IsToxic")
+    - texts, labels: dáta, na ktorých sa validuje
+    - n_splits, n_jobs, random_state: ako v cross_validate_grid
+    - models_dir: priečinok s modelmi
+
+    Returns
+    -------
+    - f1: priemerné F1 alebo None, ak žiadny uložený model nie je
+    """
+    try:
+        model, metadata = ModelRegistry(models_dir).current(label)
+    except FileNotFoundError:
+        return None
+    params = metadata.get("params", {})
+    if (params.get("cv_folds") == n_splits and params.get("cv_seed") == random_state
+            and metadata.get("data_hash") == data_fingerprint(texts, labels)):
+        return metadata["metrics"]["F1 Score"]
+    # max_samples ako počet vzoriek, presne ako v aktuálnom modeli
+    grid = {"alpha": [model.estimators[0].alpha], "n_estimators": [len(model.estimators)],
+            "max_samples": [int(model.max_samples)]}
+    return cross_validate_grid(texts, labels, grid, n_splits, n_jobs, random_state)[0]["mean"]["F1 Score"]
+
+def select_and_save(label, grid=DEFAULT_GRID, n_splits=5, n_jobs=1, random_state=0, models_dir="models",
+                    promote="if_better"):
+    """
+    Nájde najlepšie nastavenie krížovou validáciou, natrénuje ho na všetkých dátach
+    a uloží cez auto_save_best_model s priemernými metrikami z krížovej validácie.
+    Aktuálnou verziou sa stane iba vtedy, ak má vyššie priemerné F1 ako aktuálny model
+    na tých istých foldoch (current_cv_score); F1 z jedného rozdelenia dát sa s priemerom
+    z krížovej validácie neporovnáva.
+
+    Parameters
+    ----------
+    - label: názov stĺpca s labelmi (napr. "IsToxic")
+    - grid, n_splits, n_jobs, random_state: ako v cross_validate_grid
+    - models_dir: priečinok s modelmi
+    - promote: "if_better" alebo True (nová verzia sa nastaví ako aktuálna bez porovnania)
+
+    Returns
+    -------
+    - leaderboard: výsledky všetkých nastavení zoradené podľa F1
+    - model: najlepší model natrénovaný na všetkých dátach
+    """
+    texts, labels = load_data(label)
+    leaderboard = cross_validate_grid(texts, labels, grid, n_splits, n_jobs, random_state)
+    best = leaderboard[0]
+    if promote == "if_better":
+        current = current_cv_score(label, texts, labels, n_splits, n_jobs, random_state, models_dir)
+        promote = current is None or best["mean"]["F1 Score"] > current
+    model = make_model(best["params"], len(texts), random_state)
+    model.fit(texts, labels)
+    auto_save_best_model(model, best["mean"], label, models_dir, data_fingerprint(texts, labels),
+                         {"cv_folds": n_splits, "cv_seed": random_state, "cv_std": best["std"]}, promote=promote)
+    return leaderboard, model
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stratified k-fold grid search for the bagging classifier.")
+    parser.add_argument("label", help="Label column, e.g. IsToxic")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--alpha", type=float, nargs="+", default=DEFAULT_GRID["alpha"])
+    parser.add_argument("--n-estimators", type=int, nargs="+", default=DEFAULT_GRID["n_estimators"])
+    parser.add_argument("--max-samples", type=float, nargs="+", default=DEFAULT_GRID["max_samples"],
+                        help="Fractions of the training fold (<= 1.0) or sample counts")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes, defaults to all cores")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--force-promote", action="store_true",
+                        help="Make the best configuration current even if it does not beat the current model")
+    parser.add_argument("--output", help="Write the leaderboard as JSON")
+    args = parser.parse_args(argv)
+
+    max_samples = [value if value <= 1.0 else int(value) for value in args.max_samples]
+    grid = {"alpha": args.alpha, "n_estimators": args.n_estimators, "max_samples": max_samples}
+    leaderboard, _ = select_and_save(args.label, grid, args.folds, args.workers, args.seed, args.models_dir,
+                                    True if args.force_promote else "if_better")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(leaderboard, f, indent=2)
+    for rank, row in enumerate(leaderboard, 1):
+        mean, std = row["mean"], row["std"]
+        print(f"{rank:3d}. {row['params']}  F1 {mean['F1 Score']:.4f} ± {std['F1 Score']:.4f}  "
+              f"accuracy {mean['Accuracy']:.4f}")
+
+if __name__ == '__main__':
+    main()
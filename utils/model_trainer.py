@@ -1,54 +1,149 @@
 import random
+import numpy as np
 from algorithm.bagging import BaggingClassifier
 from algorithm.naive_bayes import SimpleNaiveBayesClassifier
-from utils.data_loader import load_data
-from metrics.evaluation import accuracy_metric, precision_metric, recall_metric, f1_metric
+from algorithm.multilabel import MultiLabelBaggingClassifier
+from utils.data_loader import DATA_FILE, iter_data_chunks, load_data
+from metrics.evaluation import confusion_matrix, evaluate_predictions, evaluate_multilabel, metrics_from_confusion
 from utils.model_saver import auto_save_best_model, load_best_model
+from utils.model_registry import ModelRegistry, data_fingerprint
+from utils.model_cache import model_cache
+from utils.instrumentation import instrumentation
 
-def train_model(texts, labels):
+def split_rows(n_samples, split_seed):
+    """
+    Rozdelí indexy dát v pomere 70% / 15% / 15% (trénovanie, testovanie, evaluácia).
+    Rovnaký seed dá rovnaké rozdelenie, takže odloženú evaluačnú časť sa dá neskôr
+    zostaviť znova (napr. pri zlučovaní modelu v utils.compaction).
+
+    Parameters
+    ----------
+    - n_samples: počet dokumentov
+    - split_seed: seed náhodného poradia
+
+    Returns
+    -------
+    - train_rows, test_rows, eval_rows: polia indexov
+    """
+    rows = np.random.default_rng(split_seed).permutation(n_samples)
+    train_end = int(0.70 * n_samples)
+    test_end = int(0.85 * n_samples)
+    return rows[:train_end], rows[train_end:test_end], rows[test_end:]
+
+def train_model(texts, labels, split_seed=None):
     """
     Trénuje model na základe zoznamu textov a príslušných labelov.
-    Používa 70% dát na trénovanie, 15% na testovanie a 15% na evaluáciu.
+    Používa 70% dát na trénovanie, 15% na testovanie a 15% na evaluáciu (split_rows).
     
     Parameters
     ----------
     - texts: zoznam textov (komentárov)
     - labels: zoznam príslušných tried (napr. 0 - netoxický, 1 - toxický)
+    - split_seed: seed rozdelenia dát, ak None, zvolí sa náhodne
 
     Returns
     -------
     - model: natrénovaný model
     - metrics: slovník metrík (testovacia množina)
     """
-    combined = list(zip(texts, labels))
+    if split_seed is None:
+        split_seed = random.randrange(2 ** 32)
+    train_rows, test_rows, _ = split_rows(len(texts), split_seed)
+    
+    X_train = [texts[i] for i in train_rows]
+    y_train = [labels[i] for i in train_rows]
+    
+    X_test = [texts[i] for i in test_rows]
+    y_test = [labels[i] for i in test_rows]
+    
+    model = BaggingClassifier(base_estimator=SimpleNaiveBayesClassifier,
+                              n_estimators=10,
+                              max_samples=len(X_train))
+    with instrumentation.timer("train.fit"):
+        model.fit(X_train, y_train)
+    
+    with instrumentation.timer("train.evaluate"):
+        predictions_test = model.predict(X_test)
+        test_metrics = evaluate_predictions(y_test, predictions_test)
+    
+    return model, test_metrics
+
+def train_multilabel_model(texts, label_vectors, labels):
+    """
+    Trénuje jeden model pre všetky labely naraz, používa rovnaký 70%/15%/15% split ako train_model.
+
+    Parameters
+    ----------
+    - texts: zoznam textov (komentárov)
+    - label_vectors: zoznam vektorov labelov (jeden zoznam na text v poradí labels)
+    - labels: zoznam názvov labelov
+
+    Returns
+    -------
+    - model: natrénovaný MultiLabelBaggingClassifier
+    - metrics: slovník label -> slovník metrík (testovacia množina)
+    """
+    combined = list(zip(texts, label_vectors))
     random.shuffle(combined)
     texts_shuffled, labels_shuffled = zip(*combined)
     n_samples = len(texts_shuffled)
-    
+
     train_end = int(0.70 * n_samples)
     test_end = int(0.85 * n_samples)
-    
+
     X_train = list(texts_shuffled[:train_end])
     y_train = list(labels_shuffled[:train_end])
-    
+
     X_test = list(texts_shuffled[train_end:test_end])
     y_test = list(labels_shuffled[train_end:test_end])
-    
-    model = BaggingClassifier(base_estimator=SimpleNaiveBayesClassifier,
-                              n_estimators=10,
-                              max_samples=len(X_train))
+
+    model = MultiLabelBaggingClassifier(labels, n_estimators=10, max_samples=len(X_train))
     model.fit(X_train, y_train)
-    
+
     predictions_test = model.predict(X_test)
-    test_metrics = {
-        "Accuracy": accuracy_metric(y_test, predictions_test),
-        "Precision": precision_metric(y_test, predictions_test),
-        "Recall": recall_metric(y_test, predictions_test),
-        "F1 Score": f1_metric(y_test, predictions_test)
-    }
-    
+    test_metrics = evaluate_multilabel(y_test, predictions_test, labels)
+
     return model, test_metrics
 
+def train_model_streaming(label: str, path=DATA_FILE, chunk_size=10000, test_every=7, random_state=None):
+    """
+    Trénuje model na veľkom datasete po blokoch: každý blok sa hneď pripočíta k počtom
+    modelu (BaggingClassifier.partial_fit), takže pamäť nezávisí od veľkosti textov.
+    Každý test_every-ty riadok sa odloží na testovanie, ktoré prebehne v druhom prechode
+    po blokoch so sčítavaním matice zámen.
+
+    Parameters
+    ----------
+    - label: názov stĺpca s labelmi (napr. "IsToxic")
+    - path: cesta k CSV súboru
+    - chunk_size: počet riadkov v bloku
+    - test_every: každý koľký riadok patrí do testovacej množiny
+    - random_state: seed pre bootstrap vzorky
+
+    Returns
+    -------
+    - model: natrénovaný model
+    - metrics: slovník metrík (testovacia množina)
+    """
+    model = BaggingClassifier(base_estimator=SimpleNaiveBayesClassifier, n_estimators=10,
+                              random_state=random_state)
+    start = 0
+    for texts, labels in iter_data_chunks([label], chunk_size, path):
+        train = (start + np.arange(len(texts))) % test_every != 0
+        with instrumentation.timer("train.fit_chunk"):
+            model.partial_fit([text for text, keep in zip(texts, train) if keep], labels[train, 0].tolist())
+        start += len(texts)
+
+    classes = [False, True]
+    matrix = np.zeros((2, 2), dtype=np.int64)
+    start = 0
+    for texts, labels in iter_data_chunks([label], chunk_size, path):
+        test = (start + np.arange(len(texts))) % test_every == 0
+        predictions = model.predict([text for text, keep in zip(texts, test) if keep])
+        matrix += confusion_matrix(labels[test, 0].tolist(), predictions, classes)[0]
+        start += len(texts)
+    return model, metrics_from_confusion(matrix, positive_index=1)
+
 def evaluate_model(model, texts, labels):
     """
     Vyhodnotí existujúci model pomocou 70%/15%/15% splitu (trénovacia časť nie je použitá).
@@ -74,22 +169,17 @@ def evaluate_model(model, texts, labels):
     y_eval = list(labels_shuffled[eval_start:])
     
     predictions_eval = model.predict(X_eval)
-    eval_metrics = {
-        "Accuracy": accuracy_metric(y_eval, predictions_eval),
-        "Precision": precision_metric(y_eval, predictions_eval),
-        "Recall": recall_metric(y_eval, predictions_eval),
-        "F1 Score": f1_metric(y_eval, predictions_eval)
-    }
+    eval_metrics = evaluate_predictions(y_eval, predictions_eval)
     
     return eval_metrics
 
 def get_trained_model(label: str):
     """
-    Načíta dáta a pokúsi sa načítať najlepší uložený model pre daný label.
-    Ak model existuje, vyhodnotí sa na aktuálnom splite.
-    Potom sa natrénuje nový model a porovná F1 skóre s existujúcim najlepším.
-    Ak je nový model lepší, uloží sa ako najlepší a jeho výsledky
-    sa uložia do evaluačného grafu s príponou "_best".
+    Vráti najlepší uložený model pre daný label spolu s metrikami, ktoré
+    sa vypočítali a uložili pri jeho trénovaní. Model sa načíta cez
+    cache, takže opakované volania (napr. pri každom rerune Streamlitu)
+    súbor znova nečítajú, kým sa nezmení.
+    Ak uložený model neexistuje, natrénuje sa nový a uloží sa ako najlepší.
     
     Parameters
     ----------
@@ -100,13 +190,52 @@ def get_trained_model(label: str):
     - model: najlepší model pre daný label
     - metrics: slovník metrík na testovacej množine
     """
+    model_filename = f"models/best_model_{label}.pkl"
+    best_model, best_metrics = model_cache.get(model_filename)
+    if best_model is not None:
+        instrumentation.count("train.reused_saved_model")
+        return best_model, best_metrics
+
     texts, labels = load_data(label)
-    best_model, best_metrics = load_best_model(f"models/best_model_{label}.pkl")
+    # seed rozdelenia ide do metadát verzie, aby sa evaluačná časť dala zostaviť znova
+    split_seed = random.randrange(2 ** 32)
+    model, test_metrics = train_model(texts, labels, split_seed)
+    with instrumentation.timer("train.save"):
+        auto_save_best_model(model, test_metrics, label, data_hash=data_fingerprint(texts, labels),
+                             params={"split_seed": split_seed})
+    model_cache.invalidate(model_filename)
+    return model, test_metrics
 
-    if best_model is not None:
-        test_metrics = evaluate_model(best_model, texts, labels)
-        return best_model, test_metrics
-    else:
-        model, test_metrics = train_model(texts, labels, label)
-        auto_save_best_model(model, test_metrics, f"models/best_model_{label}.pkl")
-        return model, test_metrics
\ No newline at end of file
+def update_saved_model(label: str, texts, labels):
+    """
+    Dotrénuje uložený najlepší model pre daný label na novej dávke označených
+    komentárov (BaggingClassifier.partial_fit) a uloží ho ako novú aktuálnu verziu
+    v registri (metadáta odkazujú na pôvodnú verziu). Metriky uložené s modelom
+    sa ponechajú, nové dáta nemajú oddelenú testovaciu množinu. Aktualizácia je
+    reprodukovateľná: model bez random_state dostane seed podľa čísla pôvodnej verzie.
+
+    Parameters
+    ----------
+    - label: názov stĺpca s labelmi (napr. "IsToxic")
+    - texts: nové texty (komentáre)
+    - labels: ich triedy
+
+    Returns
+    -------
+    - model: aktualizovaný model
+    """
+    model_filename = f"models/best_model_{label}.pkl"
+    registry = ModelRegistry()
+    base_version = registry.current_version(label)
+    model, metrics = load_best_model(model_filename)
+    if model is None:
+        raise FileNotFoundError(f"No saved model found for {label}")
+    if getattr(model, "random_state", None) is None:
+        # bez seedu by Poissonove váhy boli pri každom behu iné; seed z pôvodnej verzie
+        # zaručí, že rovnaká aktualizácia rovnakej verzie dá rovnaký model
+        model.random_state = int(base_version) if base_version is not None else 0
+    model.partial_fit(texts, labels)
+    registry.register(label, model, metrics, data_fingerprint(texts, labels),
+                      {"update_of": base_version}, promote=True)
+    model_cache.invalidate(model_filename)
+    return model
\ No newline at end of file
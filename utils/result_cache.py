@@ -0,0 +1,249 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+import numpy as np
+from algorithm.sparse import FeatureHasher
+from algorithm.tokenizer import default_tokenizer
+from utils.instrumentation import instrumentation
+from utils.model_registry import add_save_listener
+
+# -----------------------------------------------------------
+# Cache výsledkov predikcie pre opakované komentáre
+# -----------------------------------------------------------
+# Kľúčom je hash verzie modelov a postupnosti tokenov po normalizácii tokenizérom
+# (rovnakej ako v SimpleNaiveBayesClassifier.tokenize). Predikcia závisí iba od tokenov,
+# takže komentáre líšiace sa veľkosťou písmen, interpunkciou alebo medzerami zdieľajú
+# jeden záznam. Verzia je odtlačok načítaných modelov, preto iný model nikdy nedostane
+# cudzí výsledok ani pri cache zdieľanej procesmi.
+
+_MODEL_ARRAYS = ("log_priors", "log_probs", "log_prior_ratios", "log_ratios")
+
+def model_version(models):
+    """
+    Vypočíta odtlačok modelov z ich tried, slovníka a matíc pravdepodobností.
+
+    Parameters
+    ----------
+    - models: slovník label -> model
+
+    Returns
+    -------
+    - version: hexadecimálny reťazec, zmení sa pri akejkoľvek zmene niektorého modelu
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for label in sorted(models):
+        model = models[label]
+        model.predict([])  # staršie modely sa kompilujú pri prvej predikcii
+        digest.update(f"{label}\n{getattr(model, 'classes', None)!r}\n".encode("utf-8"))
+        for name in _MODEL_ARRAYS:
+            array = getattr(model, name, None)
+            if array is not None:
+                digest.update(name.encode("utf-8"))
+                digest.update(np.ascontiguousarray(array).data)
+        vocab_index = getattr(model, "vocab_index", None)
+        if isinstance(vocab_index, FeatureHasher):
+            digest.update(f"hashed {vocab_index.n_features} {vocab_index.ngram_range} "
+                          f"{vocab_index.char_ngram_range}".encode("utf-8"))
+        elif vocab_index is not None:
+            digest.update("\n".join(vocab_index).encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+class _SharedStore:
+    """
+    Úroveň cache zdieľaná procesmi v súbore SQLite. Pamäť ohraničuje max_entries,
+    pri prekročení sa mažú najstaršie zápisy (poradie vloženia, nie posledného použitia,
+    aby čítanie nemuselo zapisovať).
+    """
+    def __init__(self, path, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS results "
+                                 "(key BLOB PRIMARY KEY, value TEXT NOT NULL, expires REAL)")
+
+    def get_many(self, keys):
+        found = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT key, value, expires FROM results WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                for key, value, expires in rows:
+                    if expires is None or expires > now:
+                        found[key] = json.loads(value)
+        return found
+
+    def put_many(self, items):
+        expires = None if self.ttl is None else time.time() + self.ttl
+        rows = [(key, json.dumps(value), expires) for key, value in items]
+        with self._lock:
+            self._connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", rows)
+            self._writes += len(rows)
+            if self._writes >= max(self.max_entries // 10, 1):
+                self._writes = 0
+                self._connection.execute("DELETE FROM results WHERE expires <= ?", (time.time(),))
+                self._connection.execute(
+                    "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY rowid "
+                    "LIMIT max((SELECT COUNT(*) FROM results) - ?, 0))", (self.max_entries,))
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM results")
+
+class ResultCache:
+    """
+    LRU cache výsledkov predikcie ohraničená počtom záznamov, voliteľne s časom platnosti (TTL)
+    a so spoločnou úrovňou pre viac procesov (súbor SQLite). Záznam nájdený v spoločnej
+    úrovni sa skopíruje do lokálnej LRU.
+    Všetky cache v procese sa vyprázdnia, keď register modelov nastaví novú aktuálnu verziu
+    (add_save_listener). Správnosť na tom nezávisí: kľúč obsahuje odtlačok modelov, ktoré
+    výsledok počítajú, takže modely mimo registra (server.py --compact) sa nikdy nepomiešajú,
+    invalidácia iba skôr uvoľní záznamy, ktoré už nikto nepoužije.
+    """
+    def __init__(self, max_entries=100000, ttl=None, shared_path=None):
+        """
+        Parameters
+        ----------
+        - max_entries: najväčší počet záznamov v pamäti procesu (aj v spoločnej úrovni)
+        - ttl: čas platnosti záznamu v sekundách, ak None, záznamy neexpirujú
+        - shared_path: cesta k súboru SQLite zdieľanému procesmi, ak None, cache je iba v procese
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # kľúč -> (čas expirácie alebo None, výsledok)
+        self._lock = threading.Lock()
+        self._shared = None if shared_path is None else _SharedStore(shared_path, max_entries, ttl)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches.add(self)
+
+    def get_many(self, keys):
+        """
+        Vráti výsledky pre kľúče, None pre kľúče, ktoré v cache nie sú alebo expirovali.
+        """
+        now = time.monotonic()
+        results = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and (entry[0] is None or entry[0] > now):
+                    self._entries.move_to_end(key)
+                    results[i] = entry[1]
+                else:
+                    missing.append(i)
+        if missing and self._shared is not None:
+            found = self._shared.get_many([keys[i] for i in missing])
+            if found:
+                self._store(found.items())
+                for i in missing:
+                    results[i] = found.get(keys[i])
+                missing = [i for i in missing if results[i] is None]
+        n_hits = len(keys) - len(missing)
+        with self._lock:
+            self.hits += n_hits
+            self.misses += len(missing)
+        instrumentation.count("result_cache.hits", n_hits)
+        instrumentation.count("result_cache.misses", len(missing))
+        return results
+
+    def put_many(self, items):
+        """
+        Uloží dvojice (kľúč, výsledok) do cache (aj do spoločnej úrovne).
+        """
+        items = list(items)
+        self._store(items)
+        if self._shared is not None:
+            self._shared.put_many(items)
+
+    def _store(self, items):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """
+        Odstráni všetky záznamy (aj zo spoločnej úrovne).
+        """
+        with self._lock:
+            self._entries.clear()
+        if self._shared is not None:
+            self._shared.clear()
+
+    def cache_info(self):
+        """
+        Vráti štatistiky cache.
+
+        Returns
+        -------
+        - info: slovník s počtom zásahov, výpadkov, vyradených záznamov, veľkosťou a úspešnosťou
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_entries,
+                "hit_rate": self.hits / total if total else 0.0,
+                "shared": self._shared is not None,
+            }
+
+# všetky cache v procese, aby ich prepnutie verzie v registri mohlo vyprázdniť
+_caches = weakref.WeakSet()
+
+def _invalidate_all(model_filename):
+    for cache in list(_caches):
+        cache.invalidate()
+
+add_save_listener(_invalidate_all)
+
+def cached_predict_fn(predict_fn, models, cache, tokenizer=None):
+    """
+    Obalí funkciu predikcie cache výsledkov. Z dávky sa modelmi vyhodnotia iba texty,
+    ktorých tokeny v cache nie sú, a každá rovnaká postupnosť tokenov iba raz.
+
+    Parameters
+    ----------
+    - predict_fn: funkcia zoznam textov -> zoznam výsledkov (napr. z server.make_predict_fn)
+    - models: slovník label -> model, ktoré predict_fn používa (určuje verziu v kľúči)
+    - cache: ResultCache
+    - tokenizer: normalizácia textu na tokeny, ak None, default_tokenizer
+                 (modely musia používať rovnaký tokenizér)
+
+    Returns
+    -------
+    - predict: funkcia zoznam textov -> zoznam výsledkov; rovnaké texty dostanú ten istý objekt výsledku
+    """
+    tokenize = tokenizer or default_tokenizer
+    version = model_version(models).encode("utf-8")
+
+    def predict(texts):
+        keys = [hashlib.blake2b(version + " ".join(tokenize(text)).encode("utf-8", "surrogatepass"),
+                                digest_size=16).digest() for text in texts]
+        results = cache.get_many(keys)
+        missing = {}  # kľúč -> index prvého textu s týmto kľúčom
+        for i, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                missing.setdefault(key, i)
+        if not missing:
+            return results
+        computed = dict(zip(missing, predict_fn([texts[i] for i in missing.values()])))
+        cache.put_many(computed.items())
+        return [computed[key] if result is None else result for key, result in zip(keys, results)]
+    return predict